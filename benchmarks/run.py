@@ -0,0 +1,287 @@
+"""Benchmarks yamp on a synthetic library.
+
+Each stage is timed separately, over several repetitions, and its peak memory usage is measured
+with tracemalloc during an extra run, so that the tracing doesn't distort the timings. The memory
+which is still held at the end of that run is measured too, which for `Linkifier.__init__` is the
+size of the link index. The results are saved as JSON, which makes it possible to compare two commits:
+
+    python benchmarks/run.py --preset medium --output before.json
+    git checkout other-branch
+    python benchmarks/run.py --preset medium --output after.json
+    python benchmarks/run.py --compare before.json after.json
+
+"""
+import argparse
+import dataclasses
+import json
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import synthetic
+
+import yamp
+from yamp import manifest
+from yamp import parsing
+from yamp import utils
+import yamp.static
+
+LIBRARY = "synth"
+
+
+def _forget_library():
+    """Unloads the synthetic library, so that each run has to import it again."""
+    for name in list(sys.modules):
+        if name == LIBRARY or name.startswith(f"{LIBRARY}."):
+            del sys.modules[name]
+    yamp.static.clear()
+    parsing.clear()
+    utils.resolution_cache.clear()
+    manifest.clear()
+
+
+def _pages(docs_dir: pathlib.Path):
+    return [
+        page.read_text()
+        for page in sorted(docs_dir.glob("**/*.md"))
+        if "linkified" not in page.parts
+    ]
+
+
+def benchmarks(docs_dir: pathlib.Path):
+    """Returns the benchmarks, as (setup, run) pairs. The setup isn't measured.
+
+    `print_library` includes the import of the library, whereas `Linkifier.__init__` is measured
+    with the library already imported, as it would be after the API reference has been built.
+
+    """
+
+    # The outputs are removed beforehand, so that every file gets written
+    def print_library_setup():
+        _forget_library()
+        shutil.rmtree(docs_dir.joinpath("api"), ignore_errors=True)
+
+    def print_library():
+        yamp.print_library(LIBRARY, output_dir=docs_dir.joinpath("api"))
+
+    def import_library():
+        _forget_library()
+        yamp._import_module(f"{LIBRARY}.api")
+
+    # The linkifier is returned, so that the memory its index holds is measured
+    def linkifier_init():
+        return yamp.Linkifier(LIBRARY)
+
+    linkifier = None
+    pages = []
+
+    def linkify_setup():
+        nonlocal linkifier, pages
+        import_library()
+        linkifier = yamp.Linkifier(LIBRARY)
+        pages = _pages(docs_dir)
+
+    def linkify():
+        for page in pages:
+            linkifier.linkify(page)
+
+    def linkify_docs_setup():
+        import_library()
+        shutil.rmtree(docs_dir.joinpath("linkified"), ignore_errors=True)
+
+    def linkify_docs():
+        yamp.linkify_docs(LIBRARY, docs_dir=docs_dir)
+
+    # A page which is too large to be read in memory, such as a changelog, is linkified in chunks
+    large_dir = docs_dir.parent.joinpath("large")
+
+    def linkify_large_page_setup():
+        import_library()
+        shutil.rmtree(large_dir, ignore_errors=True)
+        large_dir.mkdir()
+        text = "".join(_pages(docs_dir))
+        with open(large_dir.joinpath("changelog.md"), "w") as file:
+            for _ in range(2 * yamp.STREAM_SIZE // max(len(text), 1) + 1):
+                file.write(text)
+
+    def linkify_large_page():
+        yamp.linkify_docs(LIBRARY, docs_dir=large_dir)
+
+    # Rendering from the IR doesn't import the library
+    def render_ir_setup():
+        _forget_library()
+        shutil.rmtree(docs_dir.joinpath("api"), ignore_errors=True)
+        shutil.rmtree(docs_dir.joinpath("linkified"), ignore_errors=True)
+
+    def render_ir():
+        yamp.render_ir(docs_dir.parent.joinpath("api.jsonl"), docs_dir=docs_dir)
+
+    return {
+        "print_library": (print_library_setup, print_library),
+        "Linkifier.__init__": (import_library, linkifier_init),
+        "Linkifier.linkify": (linkify_setup, linkify),
+        "linkify_docs": (linkify_docs_setup, linkify_docs),
+        "linkify_large_page": (linkify_large_page_setup, linkify_large_page),
+        "render_ir": (render_ir_setup, render_ir),
+    }
+
+
+def measure(setup, run, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        setup()
+        tic = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - tic)
+
+    setup()
+    tracemalloc.start()
+    result = run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "times": times,
+        "peak_memory": peak,
+        "retained_memory": retained,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=pathlib.Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(config: synthetic.Config, repeat=5, only=None, verbose=False) -> dict:
+    root = pathlib.Path(tempfile.mkdtemp(prefix="yamp-bench-"))
+    try:
+        synthetic.generate(root, LIBRARY, config)
+        sys.path.insert(0, str(root))
+        docs_dir = root.joinpath("docs")
+
+        # The API reference is built once beforehand, for the benchmarks which linkify it, along
+        # with its IR
+        _forget_library()
+        yamp.print_library(
+            LIBRARY,
+            output_dir=docs_dir.joinpath("api"),
+            ir_path=root.joinpath("api.jsonl"),
+        )
+        # The size of the link index, which the figures of Linkifier.__init__ relate to
+        table = yamp.Linkifier(LIBRARY).symbols
+        index = {"names": len(table), "symbols": len(table.paths)}
+        if verbose:
+            print(
+                f"{'index':<20} {index['names']:>8} names {index['symbols']:>8} symbols"
+            )
+
+        results = {}
+        for name, (setup, func) in benchmarks(docs_dir).items():
+            if only and name not in only:
+                continue
+            results[name] = measure(setup, func, repeat=repeat)
+            if verbose:
+                print(
+                    f"{name:<20} {results[name]['median']:>8.3f}s "
+                    f"{results[name]['peak_memory'] / 2**20:>8.1f} MiB "
+                    f"{results[name]['retained_memory'] / 2**20:>8.1f} MiB"
+                )
+    finally:
+        if str(root) in sys.path:
+            sys.path.remove(str(root))
+        _forget_library()
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "yamp": {"version": yamp.__version__, "commit": _commit()},
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": dataclasses.asdict(config),
+        "repeat": repeat,
+        "index": index,
+        "benchmarks": results,
+    }
+
+
+def compare(before: dict, after: dict) -> str:
+    """Formats the differences between two sets of results."""
+    if before["config"] != after["config"]:
+        print(
+            "Warning: the results were obtained with different configs", file=sys.stderr
+        )
+    lines = [
+        f"{'Benchmark':<20} {'Before':>9} {'After':>9} {'Ratio':>7} "
+        f"{'Before MiB':>11} {'After MiB':>10} {'Before kept':>12} {'After kept':>11}"
+    ]
+    for name, a in before["benchmarks"].items():
+        if (b := after["benchmarks"].get(name)) is None:
+            continue
+        lines.append(
+            f"{name:<20} {a['median']:>8.3f}s {b['median']:>8.3f}s "
+            f"{b['median'] / a['median']:>6.2f}x "
+            f"{a['peak_memory'] / 2**20:>11.1f} {b['peak_memory'] / 2**20:>10.1f} "
+            # Results from before the retained memory was measured don't have it
+            f"{a.get('retained_memory', 0) / 2**20:>12.1f} "
+            f"{b.get('retained_memory', 0) / 2**20:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=synthetic.PRESETS, default="medium")
+    for field in dataclasses.fields(synthetic.Config):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=int,
+            dest=field.name,
+            help=f"overrides the preset's {field.name}",
+        )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", nargs="+", help="the benchmarks to run, they all are by default"
+    )
+    parser.add_argument("--output", help="where to save the results, as JSON")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="compare two result files instead of running the benchmarks",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (json.loads(pathlib.Path(p).read_text()) for p in args.compare)
+        print(compare(before, after))
+        return
+
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(synthetic.Config)
+        if getattr(args, field.name) is not None
+    }
+    config = dataclasses.replace(synthetic.PRESETS[args.preset], **overrides)
+    results = run(config, repeat=args.repeat, only=args.only, verbose=True)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
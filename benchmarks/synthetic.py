@@ -0,0 +1,227 @@
+"""Generates synthetic libraries, along with some hand-written docs which refer to them.
+
+The shape of a library is controlled by a handful of knobs, which makes it possible to see how
+yamp scales along each one of them. The generation is deterministic for a given seed.
+
+Examples
+--------
+
+>>> import tempfile
+
+>>> with tempfile.TemporaryDirectory() as root:
+...     config = Config(modules=2, submodules=1, classes=2, functions=1, pages=1)
+...     files = generate(root, "synth", config)
+...     sorted(str(path.relative_to(root)) for path in files)[:5]
+['docs/index.md', 'docs/pages/page0.md', 'synth/__init__.py', 'synth/api.py', 'synth/mod0/__init__.py']
+
+"""
+import dataclasses
+import pathlib
+import random
+import textwrap
+
+WORDS = (
+    "the model learns from a stream of data one sample at a time and updates its state "
+    "which makes it possible to handle concept drift without retraining from scratch"
+).split()
+
+
+@dataclasses.dataclass
+class Config:
+    """The shape of a synthetic library.
+
+    Parameters
+    ----------
+    modules
+        Number of top-level modules.
+    submodules
+        Number of submodules in each module.
+    classes
+        Number of classes in each module and submodule.
+    functions
+        Number of functions in each module and submodule.
+    depth
+        Length of the inheritance chains. Each class inherits from the previous one in its chain.
+    methods
+        Number of methods per class.
+    doc_lines
+        Number of lines in each extended summary.
+    references
+        Number of references to other objects in each extended summary.
+    pages
+        Number of hand-written pages.
+    seed
+        Random seed.
+
+    """
+
+    modules: int = 10
+    submodules: int = 2
+    classes: int = 10
+    functions: int = 5
+    depth: int = 3
+    methods: int = 5
+    doc_lines: int = 10
+    references: int = 3
+    pages: int = 20
+    seed: int = 42
+
+
+PRESETS = {
+    "small": Config(modules=3, submodules=1, classes=5, functions=2, pages=5),
+    "medium": Config(),
+    "large": Config(modules=30, submodules=3, classes=20, functions=10, pages=100),
+}
+
+
+class _Generator:
+    def __init__(self, name: str, config: Config):
+        self.name = name
+        self.config = config
+        self.rng = random.Random(config.seed)
+        # Fully qualified names of the public objects, used for cross-references
+        self.objects = [
+            f"{name}.{module}.{obj}"
+            for module in self.module_paths()
+            for obj in self.object_names()
+        ]
+
+    def module_paths(self):
+        for i in range(self.config.modules):
+            yield f"mod{i}"
+            for j in range(self.config.submodules):
+                yield f"mod{i}.sub{j}"
+
+    def object_names(self):
+        for k in range(self.config.classes):
+            yield f"Class{k}"
+        for k in range(self.config.functions):
+            yield f"function_{k}"
+
+    def sentence(self):
+        return " ".join(self.rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+
+    def extended_summary(self):
+        lines = [self.sentence() for _ in range(self.config.doc_lines)]
+        for _ in range(self.config.references):
+            if lines:
+                i = self.rng.randrange(len(lines))
+                lines[i] += f" See {self.rng.choice(self.objects)}."
+        return "\n".join(lines)
+
+    def docstring(self, summary, params=(), returns=None, indent=4):
+        doc = [summary, "", self.extended_summary(), ""]
+        if params:
+            doc.extend(["Parameters", "----------"])
+            for param in params:
+                doc.extend([param, f"    {self.sentence()}"])
+            doc.append("")
+        if returns:
+            doc.extend(["Returns", "-------", returns, f"    {self.sentence()}", ""])
+        text = '"""' + "\n".join(doc) + '\n"""'
+        return textwrap.indent(text, " " * indent).lstrip()
+
+    def classes(self):
+        code = []
+        for k in range(self.config.classes):
+            base = f"Class{k - 1}" if k % self.config.depth else "object"
+            code.append(f"class Class{k}({base}):")
+            code.append(
+                "    "
+                + self.docstring(f"Class number {k}.", params=["a", "b"], indent=4)
+            )
+            code.append("")
+            code.append("    def __init__(self, a: int = 1, b: float = 0.5):")
+            code.append("        self.a = a")
+            code.append("        self.b = b")
+            for m in range(self.config.methods):
+                code.append("")
+                # Children override their parent's methods without documenting them again, so
+                # that the docstrings and annotations have to be looked up in the ancestors
+                if base != "object" and m % 2:
+                    code.append(f"    def method_{m}(self, x, y=None):")
+                    code.append("        return x")
+                    continue
+                code.append(f"    def method_{m}(self, x: int, y=None) -> float:")
+                doc = self.docstring(
+                    f"Method number {m}.", params=["x", "y"], returns="float", indent=8
+                )
+                code.append(f"        {doc}")
+                code.append("        return float(x)")
+            code.extend(["", ""])
+        return "\n".join(code)
+
+    def functions(self):
+        code = []
+        for k in range(self.config.functions):
+            code.append(f"def function_{k}(x: int, y: float = 1.0) -> float:")
+            doc = self.docstring(
+                f"Function number {k}.", params=["x", "y"], returns="float", indent=4
+            )
+            code.append(f"    {doc}")
+            code.extend(["    return x * y", "", ""])
+        return "\n".join(code)
+
+    def package_init(self, doc, children):
+        names = list(self.object_names())
+        code = [f'"""{doc}"""']
+        if self.config.classes:
+            classes = ", ".join(n for n in names if n.startswith("Class"))
+            code.append(f"from .classes import {classes}")
+        if self.config.functions:
+            functions = ", ".join(n for n in names if n.startswith("function"))
+            code.append(f"from .functions import {functions}")
+        if children:
+            code.append(f"from . import {', '.join(children)}")
+        code.append(f"__all__ = {names + list(children)!r}")
+        return "\n".join(code) + "\n"
+
+    def page(self, title):
+        paragraphs = [f"# {title}", ""]
+        for _ in range(5):
+            paragraphs.extend([self.extended_summary(), ""])
+            obj = self.rng.choice(self.objects)
+            paragraphs.extend(["```python", f"{obj}()", "```", ""])
+        return "\n".join(paragraphs)
+
+    def files(self):
+        name = self.name
+        modules = [f"mod{i}" for i in range(self.config.modules)]
+        yield f"{name}/__init__.py", (
+            f'"""A synthetic library."""\nfrom . import {", ".join(modules)}\n'
+            f'__version__ = "0.0.0"\n__all__ = {modules!r}\n'
+        )
+        yield f"{name}/api.py", (
+            f"from {name} import {', '.join(modules)}\n__all__ = {modules!r}\n"
+        )
+        for module in self.module_paths():
+            path = f"{name}/{module.replace('.', '/')}"
+            children = (
+                []
+                if "." in module
+                else [f"sub{j}" for j in range(self.config.submodules)]
+            )
+            yield f"{path}/__init__.py", self.package_init(
+                f"Module {module}. {self.sentence()}", children
+            )
+            yield f"{path}/classes.py", self.classes()
+            yield f"{path}/functions.py", self.functions()
+        yield "docs/index.md", self.page("Home")
+        for k in range(self.config.pages):
+            yield f"docs/pages/page{k}.md", self.page(f"Page {k}")
+
+
+def generate(root, name: str, config: Config = None) -> list:
+    """Writes a synthetic library called `name`, and its docs, in the `root` directory.
+
+    The library can be imported once `root` is in `sys.path`. The paths of the written files are
+    returned.
+
+    """
+    paths = []
+    for path, content in _Generator(name, config or Config()).files():
+        path = pathlib.Path(root, path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        paths.append(path)
+    return paths
@@ -0,0 +1,4 @@
+import importlib.util
+
+# The MkDocs plugin can only be imported if MkDocs is installed
+collect_ignore = [] if importlib.util.find_spec("mkdocs") else ["yamp/plugin.py"]
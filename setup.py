@@ -21,8 +21,11 @@ setup(
     install_requires=["numpydoc"],
     extras_require={
         "dev": ["black", "pytest"],
+        "brotli": ["brotli"],
+        "mkdocs": ["mkdocs"],
     },
     entry_points={
         "console_scripts": ["yamp=yamp:cli_hook"],
+        "mkdocs.plugins": ["yamp=yamp.plugin:YampPlugin"],
     },
 )
@@ -4,488 +4,1829 @@ the __doc__ of each object and formats it so that MkDocs can process it in turn.
 
 """
 import argparse
-import doctest
+import bisect
+import concurrent.futures
+import contextlib
+import cProfile
 import functools
 import importlib
+import importlib.metadata
 import inspect
+import io
+import itertools
+import json
 import os
 import pathlib
 import re
-import shutil
-
-from numpydoc.docscrape import ClassDoc, FunctionDoc
-
+import sys
+import time
+import traceback
+
+from yamp import cache
+from yamp import config
+from yamp import examples
+from yamp import exclusions
+from yamp import ir
+from yamp import isolation
+from yamp import manifest
 from yamp import md
+from yamp import parsing
+from yamp import profiling
+from yamp import rendering
+from yamp import symbols
 from yamp import utils
+from yamp import watch
+from yamp.registry import Registry
+from yamp.writer import Writer, _hash
+import yamp.inventory
+import yamp.search
+import yamp.shard
+import yamp.static
+import yamp.store
+
+__version__ = "0.0.1"
+
+API_PAGES = "title: API reference 🍱\narrange:\n  - overview.md\n  - ...\n"
+
+# Pages which are larger than this are linkified in chunks, rather than being read in memory
+STREAM_SIZE = 1 << 22
+CHUNK_SIZE = 1 << 20
+
+# linkify_docs and build_docs both write to the linkified directory, each with its own manifest
+LINKIFIED_MANIFEST = ".yamp-linkified.json"
+
+
+@profiling.timed("import")
+def _import_module(name: str, static=False):
+    """Imports a module, or builds it from its source code in static mode."""
+    if static:
+        return yamp.static.import_module(name)
+    return importlib.import_module(name)
+
+
+def _library_version(library: str, static=False):
+    if version := getattr(_import_module(library, static=static), "__version__", None):
+        return str(version)
+    try:
+        return importlib.metadata.version(library)
+    except importlib.metadata.PackageNotFoundError:
+        return None
 
 
 class Linkifier:
     PATTERN = re.compile(r"`?(\w+\.)+\w+`?")
+    # The last character which can't be part of a mention nor of a code fence
+    BOUNDARY = re.compile(r"[^\w.`][\w.`]*\Z")
+    LINKS_SIZE = 1 << 16
 
-    def __init__(self, library):
+    def __init__(self, library, use_cache=False, static=False):
         self.library = library
+        self.static = static
+
+        # The index is cached on disk, and is rebuilt whenever the library's source changes. A
+        # cache hit therefore avoids importing the library altogether.
+        if use_cache:
+            key = cache.library_fingerprint(library)
+            if data := cache.load(self._cache_name, library, key):
+                self.symbols = symbols.SymbolTable.load(library, data)
+                return
+
+        self.symbols = self.build_index()
+
+        if use_cache:
+            cache.save(self._cache_name, library, key, self.symbols.dump())
+
+    @classmethod
+    def from_index(cls, library, path_index, rename_index):
+        """Creates a linkifier from an existing index, without importing the library."""
+        linkifier = cls.__new__(cls)
+        linkifier.library = library
+        linkifier.static = False
+        linkifier.symbols = symbols.SymbolTable.from_index(
+            library, path_index, rename_index
+        )
+        return linkifier
+
+    @property
+    def _cache_name(self):
+        return "linkifier.static" if self.static else "linkifier"
+
+    @property
+    def path_index(self) -> dict:
+        """The page of each name, which is spelled out from the symbol table."""
+        return self.symbols.index()[0]
+
+    @property
+    def rename_index(self) -> dict:
+        """The display name of each name, which is spelled out from the symbol table."""
+        return self.symbols.index()[1]
+
+    def resolve(self, name: str):
+        """Returns the symbol a name points to, or None if it doesn't point to any."""
+        return self.symbols.resolve(name)
+
+    def refresh(self):
+        """Rebuilds the index, after the library has been reloaded."""
+        self.symbols = self.build_index()
+        self.__dict__.pop("digest", None)
+
+    @functools.cached_property
+    def digest(self) -> str:
+        """A digest of the index, which changes whenever a page might be linkified differently."""
+        table = self.symbols
+        return manifest.digest(
+            self.library,
+            sorted(
+                (name, table.paths[position], table.displays[position])
+                for name, position in table.names.items()
+            ),
+        )
+
+    @profiling.timed("index")
+    def build_index(self):
+        """Imports the library and indexes the location of each module, class, and function."""
+
+        library = self.library
+        table = symbols.SymbolTable(library)
+        names = table.names
 
-        path_index = {}
-        rename_index = {}
+        # The api module is imported first, as importing it binds it to the library
+        api = _import_module(f"{library}.api", static=self.static)
 
         # Either modules are defined in the module's __init__.py...
         modules = dict(
-            inspect.getmembers(importlib.import_module(library), inspect.ismodule)
-        )
-        # ... either they're defined in an api.py file
-        modules.update(
-            dict(
-                inspect.getmembers(
-                    importlib.import_module(f"{library}.api"), inspect.ismodule
-                )
+            inspect.getmembers(
+                _import_module(library, static=self.static), inspect.ismodule
             )
         )
+        # ... either they're defined in an api.py file
+        modules.update(dict(inspect.getmembers(api, inspect.ismodule)))
+
+        # Each module is only walked through once, at its canonical location. Likewise, objects
+        # which are exported by several modules are linked to their canonical location.
+        registry = Registry(library)
+        # The position in the table of the symbol at each location
+        entries = {}
+        # The dotted path at which each module is walked through, and the other paths of modules
+        dotted_paths = {}
+        aliases = []
+
+        def submodules(mod):
+            return [
+                (submod_name, submod)
+                for submod_name, submod in inspect.getmembers(mod, inspect.ismodule)
+                if submod_name in mod.__all__ and submod_name != "typing"
+            ]
 
         def index_module(mod_name, mod, path):
             path = os.path.join(path, mod_name)
             dotted_path = path.replace("/", ".")
+            dotted_paths[id(mod)] = dotted_path
 
             for func_name, func in inspect.getmembers(mod, inspect.isfunction):
+                location = os.path.join(path, func_name)
+                if func_name in mod.__all__:
+                    registry.add(func, location)
+                entries[location] = table.insert(
+                    # HACK: replace underscores with dashes in links
+                    os.path.join(path, utils.snake_to_kebab(func_name)).replace(
+                        "_", "-"
+                    ),
+                    f"{dotted_path}.{func_name}",
+                )
                 for e in (
                     f"{mod_name}.{func_name}",
                     f"{dotted_path}.{func_name}",
                     f"{func.__module__}.{func_name}",
                 ):
-                    path_index[e] = os.path.join(path, utils.snake_to_kebab(func_name))
-                    rename_index[e] = f"{dotted_path}.{func_name}"
+                    names[e] = entries[location]
 
             for klass_name, klass in inspect.getmembers(mod, inspect.isclass):
+                location = os.path.join(path, klass_name)
+                if klass_name in mod.__all__:
+                    registry.add(klass, location)
+                entries[location] = table.insert(
+                    location.replace("_", "-"), f"{dotted_path}.{klass_name}"
+                )
                 for e in (
                     f"{mod_name}.{klass_name}",
                     f"{dotted_path}.{klass_name}",
                     f"{klass.__module__}.{klass_name}",
                 ):
-                    path_index[e] = os.path.join(path, klass_name)
-                    rename_index[e] = f"{dotted_path}.{klass_name}"
+                    names[e] = entries[location]
 
-            for submod_name, submod in inspect.getmembers(mod, inspect.ismodule):
-                if submod_name not in mod.__all__ or submod_name == "typing":
-                    continue
+            for submod_name, submod in submodules(mod):
+                submod_path = utils.snake_to_kebab(os.path.join(path, submod_name))
+                canonical = registry.canonical(submod)
+                position = table.insert(canonical.replace("_", "-"))
                 for e in (f"{mod_name}.{submod_name}", f"{dotted_path}.{submod_name}"):
-                    path_index[e] = os.path.join(
-                        path, utils.snake_to_kebab(submod_name)
-                    )
-
-                # Recurse
-                index_module(submod_name, submod, path=path)
-
+                    names[e] = position
+
+                # Recurse, unless the module is walked through somewhere else
+                if canonical == submod_path:
+                    index_module(submod_name, submod, path=path)
+                else:
+                    aliases.append((f"{dotted_path}.{submod_name}", submod))
+
+        modules = {
+            mod_name: mod
+            for mod_name, mod in modules.items()
+            if not mod_name.startswith("_")
+        }
+        for mod_name, mod in modules.items():
+            registry.add_tree(mod, utils.snake_to_kebab(mod_name), submodules)
         for mod_name, mod in modules.items():
-            index_module(mod_name, mod, path="")
+            if registry.canonical(mod) == utils.snake_to_kebab(mod_name):
+                index_module(mod_name, mod, path="")
+
+        # The names under the other paths of a module lead to where the module is walked through.
+        # The aliases below a module are expanded before the module itself.
+        expanded = set()
+
+        def expand(alias, mod):
+            if alias in expanded or id(mod) not in dotted_paths:
+                return
+            expanded.add(alias)
+            prefix = f"{dotted_paths[id(mod)]}."
+            for other, submod in aliases:
+                if other.startswith(prefix):
+                    expand(other, submod)
+            for e in [e for e in names if e.startswith(prefix)]:
+                names[f"{alias}.{e[len(prefix):]}"] = names[e]
+
+        for alias, mod in aliases:
+            expand(alias, mod)
+
+        # The fully qualified names of objects lead to their canonical location
+        for obj in registry:
+            locations = registry.locations(obj)
+            if len(locations) > 1 and not inspect.ismodule(obj):
+                canonical = entries[registry.canonical(obj)]
+                for location in locations:
+                    e = f"{obj.__module__}.{os.path.basename(location)}"
+                    names[e] = canonical
+
+        return table
+
+    @profiling.timed("linkify")
+    def linkify(self, text):
+        return self._linkify(text, in_code=False, links={})[0]
 
-        # Prepend the name of the library to each index entry
-        for k in list(path_index.keys()):
-            path_index[f"{self.library}.{k}"] = path_index[k]
-        for k in list(rename_index.keys()):
-            rename_index[f"{self.library}.{k}"] = rename_index[k]
+    def linkify_chunks(self, chunks):
+        """Linkifies a text which comes in chunks, and yields the linkified text piece by piece.
 
-        # HACK: replace underscores with dashes in links
-        for k, v in path_index.items():
-            path_index[k] = v.replace("_", "-")
+        Each chunk is cut after its last line, or else after the last character which can't be
+        part of a mention nor of a code fence, and the rest is carried over to the next chunk. The
+        pieces are thus linkified as the whole text would be, while only about a chunk is held in
+        memory at a time.
 
-        self.path_index = path_index
-        self.rename_index = rename_index
+        """
+        in_code = False
+        links = {}
+        carry = ""
+        for chunk in chunks:
+            text = carry + chunk
+            cut = text.rfind("\n") + 1
+            if not cut and (boundary := self.BOUNDARY.search(text)):
+                cut = boundary.start() + 1
+            text, carry = text[:cut], text[cut:]
+            # The mentions are only remembered for a while, as there is no end to them
+            if len(links) > self.LINKS_SIZE:
+                links.clear()
+            if text:
+                text, in_code = self._linkify(text, in_code, links)
+                yield text
+        if carry:
+            yield self._linkify(carry, in_code, links)[0]
+
+    def _linkify(self, text, in_code: bool, links: dict):
+        """Linkifies a piece of text, which may start inside a code block. Returns the linkified
+        text, and whether it ends inside a code block."""
+
+        # The text is scanned once for code fences. A match is inside a code block if an odd
+        # number of fences end before it, which is found by bisecting the fence end offsets.
+        fences = []
+        start = text.find("```")
+        while start != -1:
+            fences.append(start + 3)
+            start = text.find("```", start + 3)
+
+        def link(token):
+            y = token.strip("`")
+            if (symbol := self.symbols.resolve(y)) and symbol.path:
+                name = y if symbol.display is None else symbol.display
+                name = f"`{name}`'" if token.startswith("`") else name
+                name = name.strip("'")
+                return f"[{name}](/api/{symbol.path})"
+            return token
 
-    def linkify(self, text):
         def replace(x):
+            token = x.group()
 
             # HACK
-            if "collections" in x.group():
-                return x.group()
-
-            if text.count("```", 0, x.start()) % 2 == 1:
-                return x.group()
-
-            y = x.group().strip("`")
-            if path := self.path_index.get(y):
-                name = self.rename_index.get(y, y)
-                name = f"`{name}`'" if x.group().startswith("`") else name
-                name = name.strip("'")
-                return f"[{name}](/api/{path})"
-            return x.group()
+            if "collections" in token:
+                return token
 
-        return self.PATTERN.sub(replace, text)
+            if (in_code + bisect.bisect_right(fences, x.start())) % 2 == 1:
+                return token
 
+            # A page tends to mention the same objects many times over
+            if token not in links:
+                links[token] = link(token)
+            return links[token]
 
-def concat_lines(lines):
-    return inspect.cleandoc(
-        " ".join(
-            # Either empty space or list item
-            f"{line}\n\n" if (line == "") or (line.strip().startswith("-")) else line
-            for line in lines
-        )
-    )
+        return self.PATTERN.sub(replace, text), (in_code + len(fences)) % 2 == 1
 
 
 def print_docstring(obj, file):
     """Prints a classes's docstring to a file."""
+    ir.print_record(ir.describe(obj), file=file)
+
+
+def describe(obj) -> dict:
+    """Returns the IR record of a class or a function."""
+    name = f"{obj.__module__}.{obj.__qualname__}"
+    with profiling.profiler.stage("extract", name=name):
+        return ir.describe(obj)
 
-    doc = ClassDoc(obj) if inspect.isclass(obj) else FunctionDoc(obj)
 
-    printf = functools.partial(print, file=file)
+def render_docstring(obj) -> str:
+    """Returns the Markdown page of a class or a function."""
+    record = describe(obj)
+    with profiling.profiler.stage("render"):
+        return ir.render(record)
 
-    printf(md.h1(obj.__name__))
-    printf(md.line(concat_lines(doc["Summary"])))
-    printf(md.line(concat_lines(doc["Extended Summary"])))
 
-    # We infer the type annotations from the signatures, and therefore rely on the signature
-    # instead of the docstring for documenting parameters
+def render_alias(name: str, location: str, canonical: str) -> str:
+    """Returns the page of an object which is documented at another location."""
+    return rendering.MARKDOWN.alias(name, canonical, location)
+
+
+def _resolve(reference, static=False):
+    """Retrieves an object from its (module, qualified name) reference."""
+    module, qualname = reference
+    obj = _import_module(module, static=static)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _init_worker(library: str, static=False, profile=False, exclude=None):
+    # A forked worker inherits the measurements of its parent, which mustn't be sent back
+    profiling.profiler.reset()
+    profiling.profiler.enabled = profile
+    exclusions.configure(exclude)
+    _import_module(f"{library}.api", static=static)
+
+
+def _describe_safely(obj) -> dict:
+    """Describes an object, or returns a placeholder if that fails."""
     try:
-        signature = inspect.signature(obj)
-    except ValueError:
-        signature = (
-            inspect.Signature()
-        )  # TODO: this is necessary for Cython classes, but it's not correct
-    params_desc = {param.name: " ".join(param.desc) for param in doc["Parameters"]}
-
-    # Parameters
-    if signature.parameters:
-        printf(md.h2("Parameters"))
-    for param in signature.parameters.values():
-        # Name
-        printf(f"- **{param.name}**\n")
-        # Type annotation
-        if param.annotation is not param.empty:
-            anno = inspect.formatannotation(param.annotation)
-            anno = anno.strip("'")
-            printf(f"     *Type* → *{anno}*\n")
-        # Default value
-        if param.default is not param.empty:
-            printf(f"     *Default* → `{param.default}`\n")
-        printf("\n", file=file)
-        # Description
-        desc = params_desc[param.name]
-        if desc:
-            printf(f"    {desc}\n")
-    printf("")
-
-    # Attributes
-    if doc["Attributes"]:
-        printf(md.h2("Attributes"))
-    for attr in doc["Attributes"]:
-        # Name
-        printf(f"- **{attr.name}**", end="")
-        # Type annotation
-        if attr.type:
-            printf(f" (*{attr.type}*)", end="")
-        printf("\n", file=file)
-        # Description
-        desc = " ".join(attr.desc)
-        if desc:
-            printf(f"    {desc}\n")
-    printf("")
-
-    # Examples
-    if doc["Examples"]:
-        printf(md.h2("Examples"))
-
-        parser = doctest.DocTestParser()
-        lines = parser.parse(inspect.cleandoc("\n".join(doc["Examples"])))
-        in_code = False
+        return describe(obj)
+    except Exception as e:
+        return ir.placeholder(obj, isolation.error(e))
 
-        for line in lines:
-
-            if isinstance(line, doctest.Example):
-                example = line
-
-                # Start code fences for new examples
-                if not in_code:
-                    printf("```python")
-                    in_code = True
-
-                printf(example.source, end="")
-                if example.want:
-                    # Close code fences for example source
-                    printf("```")
-                    # Enclose the output in code fences
-                    printf("```")
-                    printf(example.want, end="")
-                    printf("```")
-                    in_code = False
-
-            elif text := line:
-                # Close code fences for example source
-                if in_code and text.strip():
-                    printf("```")
-                    in_code = False
-                printf(text, end="")
+
+def _describe_reference(reference, static=False):
+    # The docstrings parsed by the worker are sent back, so that they can be cached on disk, as
+    # well as the worker's measurements
+    record = _describe_safely(_resolve(reference, static=static))
+    return record, parsing.drain(), profiling.profiler.drain()
+
+
+def _fingerprint_reference(reference, version: str, static=False):
+    return manifest.fingerprint(_resolve(reference, static=static), version=version)
+
+
+def _references(objects, static=False):
+    """The (module, qualified name) references of objects, or None if they can't be used."""
+    references = []
+    for obj in objects:
+        reference = (obj.__module__, obj.__qualname__)
+        try:
+            references.append(
+                reference if _resolve(reference, static=static) is obj else None
+            )
+        except (AttributeError, ImportError):
+            references.append(None)
+    return references
+
+
+def fingerprint_objects(objects, version: str, static=False, pool=None):
+    """Fingerprints a list of objects, and yields (digest, error) pairs, in order.
+
+    The objects are fingerprinted by the workers of the isolation pool, if one is provided, in
+    which case an object which exceeds its budget produces an error. See `manifest.fingerprint`.
+
+    """
+
+    if pool is None:
+        for obj in objects:
+            yield manifest.fingerprint(obj, version=version), None
+        return
+
+    # Objects which can't be looked up by reference are fingerprinted by the current process
+    references = _references(objects, static=static)
+    fingerprinted = pool.imap(
+        functools.partial(_fingerprint_reference, version=version, static=static),
+        [reference for reference in references if reference],
+    )
+    for obj, reference in zip(objects, references):
+        if reference:
+            yield next(fingerprinted)
         else:
-            # Close code fences for example source
-            if in_code:
-                printf("```")
-                in_code = False
+            yield manifest.fingerprint(obj, version=version), None
 
-    printf("")
 
-    import river.base
-    import river.ensemble
+def describe_objects(objects, library: str, jobs=1, static=False, pool=None):
+    """Describes a list of objects, in order.
 
-    # Methods
-    if inspect.isclass(obj) and doc["Methods"]:
-        printf(md.h2("Methods"))
-        printf_indent = lambda x, **kwargs: printf(f"    {x}", **kwargs)
+    When `jobs` is more than 1, the objects are described by a pool of worker processes. Each
+    worker imports the library once, and then receives references to the objects it has to
+    describe. The records are sent back, and are cheap to render.
 
-        for meth in doc["Methods"]:
+    If an object can't be described, its record is a placeholder which holds the error. If an
+    isolation pool is provided, the objects are described by its workers, each one under the
+    pool's time and memory budgets. A worker which exceeds them, or crashes, is replaced.
 
-            base_method_names = {"clone", "mutate"}
+    """
 
-            if (
-                issubclass(obj, river.base.Base)
-                and not obj is river.base.Base
-                and meth.name in base_method_names
-            ):
-                continue
+    if pool is None and (jobs <= 1 or len(objects) <= 1):
+        yield from map(_describe_safely, objects)
+        return
 
-            ensemble_method_names = {
-                "append",
-                "clear",
-                "copy",
-                "count",
-                "extend",
-                "index",
-                "insert",
-                "pop",
-                "remove",
-                "reverse",
-                "sort",
-            }
-
-            if (
-                issubclass(obj, river.base.Ensemble)
-                and not obj is river.base.Ensemble
-                and meth.name in ensemble_method_names
-            ):
-                continue
+    # Objects which can't be looked up by reference are described by the current process
+    references = _references(objects, static=static)
 
-            printf(md.line(f'???- abstract "{meth.name}"'))
+    describe_reference = functools.partial(_describe_reference, static=static)
+    with contextlib.ExitStack() as stack:
+        if pool is not None:
+            described = pool.imap(
+                describe_reference,
+                [reference for reference in references if reference],
+            )
+        else:
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=jobs,
+                    initializer=_init_worker,
+                    initargs=(
+                        library,
+                        static,
+                        profiling.profiler.enabled,
+                        exclusions.rules.config,
+                    ),
+                )
+            )
+            described = (
+                (value, None)
+                for value in executor.map(
+                    describe_reference,
+                    [reference for reference in references if reference],
+                    chunksize=max(1, len(objects) // (jobs * 4)),
+                )
+            )
 
-            # Parse method docstring
-            docstring = utils.find_method_docstring(klass=obj, method=meth.name)
-            if not docstring:
+        for obj, reference in zip(objects, references):
+            if not reference:
+                yield _describe_safely(obj)
                 continue
-            meth_doc = FunctionDoc(func=None, doc=docstring)
-
-            printf_indent(md.line(" ".join(meth_doc["Summary"])))
-            if meth_doc["Extended Summary"]:
-                printf_indent(md.line(" ".join(meth_doc["Extended Summary"])))
-
-            # We infer the type annotations from the signatures, and therefore rely on the signature
-            # instead of the docstring for documenting parameters
-            signature = utils.find_method_signature(obj, meth.name)
-            params_desc = {
-                param.name: " ".join(param.desc) for param in doc["Parameters"]
-            }
-
-            # Parameters
-            if (
-                len(signature.parameters) > 1
-            ):  # signature is never empty, but self doesn't count
-                printf_indent("**Parameters**\n")
-            for param in signature.parameters.values():
-                if param.name == "self":
-                    continue
-                # Name
-                printf_indent(f"- **{param.name}**", end="")
-                # Type annotation
-                if param.annotation is not param.empty:
-                    printf_indent(
-                        f" — *{inspect.formatannotation(param.annotation)}*", end=""
-                    )
-                # Default value
-                if param.default is not param.empty:
-                    printf_indent(f" — defaults to `{param.default}`", end="")
-                printf_indent("", file=file)
-                # Description
-                desc = params_desc.get(param.name)
-                if desc:
-                    printf_indent(f"    {desc}")
-            printf_indent("")
-
-            # Returns
-            if meth_doc["Returns"]:
-                printf_indent("**Returns**\n")
-                return_val = meth_doc["Returns"][0]
-                if signature.return_annotation is not inspect._empty:
-                    if inspect.isclass(signature.return_annotation):
-                        printf_indent(
-                            f"*{signature.return_annotation.__name__}*: ", end=""
-                        )
-                    else:
-                        printf_indent(f"*{signature.return_annotation}*: ", end="")
-                printf_indent(return_val.type)
-                printf_indent("")
-
-            # Add a space between methods
-            printf("<span />")
-
-    # Notes
-    if doc["Notes"]:
-        printf(md.h2("Notes"))
-        printf(md.line("\n".join(doc["Notes"])))
-
-    # References
-    if doc["References"]:
-        printf(md.line("\n".join(doc["References"])))
-
-
-def print_module(mod, path, overview, is_submodule=False, verbose=False):
+            value, error = next(described)
+            if error:
+                yield ir.placeholder(obj, error)
+                continue
+            record, parsed, measurements = value
+            parsing.update(parsed)
+            profiling.profiler.merge(measurements)
+            yield record
+
+
+def _submodules(mod):
+    """The public submodules of a module, such as optim.schedulers, by name."""
+    return [
+        (name, submod)
+        for name, submod in inspect.getmembers(mod, inspect.ismodule)
+        if name not in ("tags", "typing", "inspect", "skmultiflow_utils")
+        and name in mod.__all__
+        and not name.startswith("_")
+    ]
+
+
+def describe_module(
+    mod,
+    path,
+    root,
+    pages,
+    registry,
+    verbose=False,
+):
+    """Describes a module's section of the overview, and collects the pages of its classes and
+    functions.
+
+    The pages are not rendered here. Instead, a (path, object) pair is appended to `pages` for
+    each one of them. The module's .pages file is appended as a (path, text) pair. Submodules are
+    only walked through at their canonical location, which is tracked by the registry.
+
+    """
 
     mod_name = mod.__name__.split(".")[-1]
 
     # Create a directory for the module
     mod_slug = utils.snake_to_kebab(mod_name)
     mod_path = path.joinpath(mod_slug)
-    mod_short_path = str(mod_path).replace("docs/api/", "")
-    os.makedirs(mod_path, exist_ok=True)
-    with open(mod_path.joinpath(".pages"), "w") as f:
-        f.write(f"title: {mod_name}")
-
-    # Add the module to the overview
-    if is_submodule:
-        print(md.h3(mod_name), file=overview)
-    else:
-        print(md.h2(mod_name), file=overview)
-    if mod.__doc__:
-        print(md.line(mod.__doc__), file=overview)
+    mod_short_path = mod_path.relative_to(root).as_posix()
+    pages.append((mod_path.joinpath(".pages"), f"title: {mod_name}"))
+
+    record = {
+        "name": mod_name,
+        "path": mod_short_path,
+        "doc": mod.__doc__,
+        "overview": None,
+        "classes": [],
+        "functions": [],
+        "submodules": [],
+    }
 
     # Extract all public classes and functions
     ispublic = lambda x: x.__name__ in mod.__all__ and not x.__name__.startswith("_")
     classes = inspect.getmembers(mod, lambda x: inspect.isclass(x) and ispublic(x))
     funcs = inspect.getmembers(mod, lambda x: inspect.isfunction(x) and ispublic(x))
 
-    # Classes
-
     if hasattr(mod, "_docs_overview"):
+        overview = io.StringIO()
         mod._docs_overview(functools.partial(print, file=overview))
+        record["overview"] = overview.getvalue()
     else:
-        if classes and funcs:
-            print("\n**Classes**\n", file=overview)
+        for kind, members in (("classes", classes), ("functions", funcs)):
+            for _, obj in members:
+                if verbose:
+                    print(f"{mod_name}.{obj.__name__}")
 
-        for _, c in classes:
-            if verbose:
-                print(f"{mod_name}.{c.__name__}")
+                # The docstring will be written down later on
+                slug = utils.snake_to_kebab(obj.__name__)
+                record[kind].append((obj.__name__, slug))
+                pages.append((mod_path.joinpath(slug).with_suffix(".md"), obj))
 
-            # Add the class to the overview
-            slug = utils.snake_to_kebab(c.__name__)
-            print(
-                md.li(md.link(c.__name__, f"../{mod_short_path}/{slug}")),
-                end="",
-                file=overview,
+    # Sub-modules
+    for name, submod in _submodules(mod):
+        if verbose:
+            print(f"{mod_name}.{name}")
+
+        location = f"{mod_short_path}/{utils.snake_to_kebab(name)}"
+        if (canonical := registry.canonical(submod)) != location:
+            record["submodules"].append({"name": name, "alias": canonical})
+            continue
+
+        record["submodules"].append(
+            describe_module(
+                mod=submod,
+                path=mod_path,
+                root=root,
+                pages=pages,
+                registry=registry,
+                verbose=verbose,
             )
+        )
 
-            # Write down the class' docstring
-            with open(mod_path.joinpath(slug).with_suffix(".md"), "w") as file:
-                print_docstring(obj=c, file=file)
+    return record
 
-        # Functions
 
-        if classes and funcs:
-            print("\n**Functions**\n", file=overview)
+def _previous_search(output_dir: pathlib.Path, shard=None, writer=None) -> dict:
+    """The search entries of the previous build, by location. A shard keeps them in its
+    fragment."""
+    writer = writer or Writer()
+    try:
+        if shard is None:
+            text = writer.read(output_dir.joinpath(yamp.search.FILENAME))
+            rows = yamp.search.load(text)["documents"]
+        else:
+            text = writer.read(output_dir.joinpath(yamp.shard.FILENAME))
+            rows = itertools.chain.from_iterable(json.loads(text)["search"].values())
+    except (FileNotFoundError, KeyError, ValueError):
+        return {}
+    # The summary and the parameters come last, as they do in `yamp.search.fields`
+    return {row[0]: row[4:] for row in rows if row[1] != "module"}
+
+
+def print_library(
+    library: str,
+    output_dir: pathlib.Path,
+    incremental=False,
+    jobs=1,
+    static=False,
+    use_cache=False,
+    linkifier=None,
+    shard=None,
+    index=None,
+    ir_path=None,
+    verify=False,
+    embed_outputs=False,
+    timeout=None,
+    memory=None,
+    errors_path=None,
+    writer=None,
+    verbose=False,
+):
+    """Builds the API reference.
+
+    Files are only written if their content has changed, and the files which are not generated
+    anymore are deleted afterwards. In incremental mode, the pages of objects whose docstrings and
+    signatures haven't changed since the previous build are not even rendered.
+    The pages are rendered by `jobs` processes. In static mode, the library's source code is
+    parsed instead of being imported. The parsed docstrings are cached on disk if `use_cache` is
+    set. If a linkifier is provided, the pages are linkified before being written.
+
+    A shard is an (index, count) pair. A shard only writes the pages of the top-level modules it is
+    assigned, as well as a fragment for `merge_shards`, which contains its share of the `index`
+    linkifier.
+
+    The search index of the API reference is written along with the overview, see `yamp.search`.
+    A shard holds its share of it in its fragment instead.
+
+    If `ir_path` is provided, the intermediate representation of the API reference is saved
+    there, along with the link index, which is that of `index` if provided. It contains every
+    page, which is why no page is skipped in incremental mode.
+
+    If `verify` is set, the examples of the docstrings are run, and the failures are reported. No
+    page is skipped in incremental mode either, but the outcomes are cached if `use_cache` is set.
+    With `embed_outputs`, which implies `verify`, the pages display the actual outputs of the
+    examples instead of the expected ones.
+
+    An object which can't be documented gets a placeholder page, and the error is reported. If a
+    `timeout`, in seconds, or a `memory` budget, in bytes, is provided, the objects are described
+    in isolated workers under these budgets. See `describe_objects`. The examples of each object
+    are verified under the same budgets.
+
+    The problems are returned, as a dict with the failed examples and the errors. They are written
+    to `errors_path` as JSON, if it is provided.
+
+    """
 
-        for _, f in funcs:
+    # Create a directory for the API reference
+    writer = writer or Writer()
+    output = manifest.Manifest(output_dir, writer=writer)
+    if shard is None:
+        output.write(output_dir.joinpath(".pages"), API_PAGES)
+
+    utils.resolution_cache.clear()
+    manifest.clear()
+    if use_cache:
+        parsing.load(library)
+
+    api = _import_module(f"{library}.api", static=static)
+    modules = [
+        (mod_name, mod)
+        for mod_name, mod in inspect.getmembers(api, inspect.ismodule)
+        if not mod_name.startswith("_") and mod_name != "api"
+    ]
+
+    # Every location of every module is known before the modules are walked through
+    registry = Registry(library)
+    for mod_name, mod in modules:
+        registry.add_tree(mod, utils.snake_to_kebab(mod_name), _submodules)
+
+    # Each top-level module has its own section in the overview
+    sections = {}
+    with profiling.profiler.stage("collect"):
+        for mod_name, mod in modules:
             if verbose:
-                print(f"{mod_name}.{f.__name__}")
+                print(mod_name)
+            section_pages = []
+            record = describe_module(
+                mod,
+                path=output_dir,
+                root=output_dir,
+                pages=section_pages,
+                registry=registry,
+                verbose=verbose,
+            )
+            sections[mod_name] = (record, section_pages)
 
-            # Add the function to the overview
-            slug = utils.snake_to_kebab(f.__name__)
-            print(
-                md.li(md.link(f.__name__, f"../{mod_short_path}/{slug}")),
-                end="",
-                file=overview,
+    # Objects which are exposed by several modules are only rendered at their canonical location
+    locations = {}
+    for _, section_pages in sections.values():
+        for page, obj in section_pages:
+            if isinstance(obj, str):
+                continue
+            locations[page] = page.relative_to(output_dir).with_suffix("").as_posix()
+            registry.add(obj, locations[page])
+
+    # A shard only writes the pages of its own modules, while the whole library has been walked
+    # through so that every shard agrees on the canonical locations
+    owners = {}
+    if shard is not None:
+        assignment = yamp.shard.assign(
+            {name: len(section_pages) for name, (_, section_pages) in sections.items()},
+            n=shard[1],
+        )
+        owners = {utils.snake_to_kebab(name): i for name, i in assignment.items()}
+        sections = {
+            name: section
+            for name, section in sections.items()
+            if assignment[name] == shard[0]
+        }
+    pages = {}
+    for _, section_pages in sections.values():
+        for page, obj in section_pages:
+            pages.setdefault(page, obj)
+
+    # The links depend on the index, so the pages have to be rebuilt whenever it changes, and
+    # likewise for the rules which leave out methods
+    version = __version__ if linkifier is None else f"{__version__}+{linkifier.digest}"
+    version += f"+{exclusions.rules.digest}"
+    verify = verify or embed_outputs
+    if embed_outputs:
+        version += "+outputs"
+
+    # The objects are handled by isolated workers if they have a budget
+    pool = None
+    if timeout is not None or memory is not None:
+        pool = isolation.Pool(
+            jobs,
+            timeout=timeout,
+            memory=memory,
+            initializer=_init_worker,
+            initargs=(
+                library,
+                static,
+                profiling.profiler.enabled,
+                exclusions.rules.config,
+            ),
+        )
+
+    try:
+        # The search index is assembled from the records. In incremental mode, the pages which are
+        # left untouched keep the documents they had in the previous build.
+        search_entries = {}
+        previous_entries = {}
+        if incremental:
+            previous_entries = _previous_search(output_dir, shard=shard, writer=writer)
+
+        candidates = []
+        todo = []
+        failed = []
+        records = []
+        with profiling.profiler.stage("fingerprint"):
+            for page, obj in pages.items():
+                if isinstance(obj, str):
+                    output.write(page, obj)
+                    continue
+                if (canonical := registry.canonical(obj)) != locations[page]:
+                    output.write(
+                        page, render_alias(obj.__name__, locations[page], canonical)
+                    )
+                    records.append(
+                        {
+                            "kind": "alias",
+                            "path": locations[page],
+                            "name": obj.__name__,
+                            "canonical": canonical,
+                        }
+                    )
+                    continue
+                candidates.append((page, obj))
+
+            fingerprints = fingerprint_objects(
+                [obj for _, obj in candidates],
+                version=version,
+                static=static,
+                pool=pool,
+            )
+            for (page, obj), (digest, error) in zip(candidates, fingerprints):
+                if error:
+                    # An object which exceeds its budget isn't worth describing
+                    failed.append(((page, obj, None), ir.placeholder(obj, error)))
+                elif (
+                    incremental
+                    and not (ir_path or verify)
+                    and locations[page] in previous_entries
+                    and output.is_fresh(page, digest)
+                ):
+                    output.keep(page, digest)
+                    search_entries[locations[page]] = previous_entries[locations[page]]
+                else:
+                    todo.append((page, obj, digest))
+
+        described = describe_objects(
+            [obj for _, obj, _ in todo],
+            library=library,
+            jobs=jobs,
+            static=static,
+            pool=pool,
+        )
+        failures = []
+        if verify:
+            described = list(described)
+            outcomes = examples.verify(
+                described,
+                library=library,
+                version=_library_version(library, static=static),
+                jobs=jobs,
+                use_cache=use_cache,
+                timeout=timeout,
+                memory=memory,
+                verbose=verbose,
             )
+            for record, outcome in zip(described, outcomes):
+                if outcome is None:
+                    continue
+                name = f"{record['module']}.{record['qualname']}"
+                failures.extend(
+                    {"object": name, **failure} for failure in outcome["failures"]
+                )
+                if embed_outputs:
+                    record["outputs"] = outcome["outputs"]
+            for failure in failures:
+                print(
+                    examples.format_failure(failure["object"], failure) + "\n",
+                    file=sys.stderr,
+                )
+            if failures:
+                print(f"{len(failures)} examples failed", file=sys.stderr)
+
+        errors = []
+        for (page, _, digest), record in itertools.chain(zip(todo, described), failed):
+            if error := record.get("error"):
+                name = f"{record['module']}.{record['qualname']}"
+                errors.append({"object": name, "page": locations[page], **error})
+                print(f"Couldn't document {name}: {error['message']}", file=sys.stderr)
+                # The page is rendered again by the next build, even in incremental mode
+                digest = None
+            with profiling.profiler.stage("render"):
+                text = ir.render(record)
+            if linkifier:
+                text = linkifier.linkify(text)
+            output.write(page, text, source_digest=digest)
+            search_entries[locations[page]] = yamp.search.fields(record)
+            if ir_path:
+                records.append({**record, "path": locations[page]})
+    finally:
+        if pool:
+            pool.close()
+
+    if ir_path:
+        index = index or linkifier or Linkifier(library=library, static=static)
+        path_index, rename_index = index.symbols.index()
+        ir.save(
+            ir_path,
+            [
+                *({"kind": "module", **record} for record, _ in sections.values()),
+                *records,
+                {
+                    "kind": "index",
+                    "path_index": path_index,
+                    "rename_index": rename_index,
+                },
+            ],
+            library=library,
+            library_version=_library_version(library, static=static),
+            yamp=__version__,
+        )
 
-            # Write down the function' docstring
-            with open(mod_path.joinpath(slug).with_suffix(".md"), "w") as file:
-                print_docstring(obj=f, file=file)
+    if shard is None:
+        overview = md.h1("Overview") + "\n"
+        overview += "".join(ir.render_module(record) for record, _ in sections.values())
+        if linkifier:
+            overview = linkifier.linkify(overview)
+        output.write(output_dir.joinpath("overview.md"), overview)
+        output.write(
+            output_dir.joinpath(yamp.search.FILENAME),
+            yamp.search.dump(
+                yamp.search.documents(
+                    library,
+                    [record for record, _ in sections.values()],
+                    search_entries,
+                ),
+                library=library,
+                version=_library_version(library, static=static),
+            ),
+        )
+    else:
+        index = index or Linkifier(library=library, static=static)
+        path_index, rename_index = yamp.shard.split_index(
+            *index.symbols.index(), owners=owners, shard=shard[0]
+        )
+        fragment = {
+            "library": library,
+            "shard": shard[0],
+            "shards": shard[1],
+            "library_version": _library_version(library, static=static),
+            "modules": [mod_name for mod_name, _ in modules],
+            "sections": {
+                name: ir.render_module(record) for name, (record, _) in sections.items()
+            },
+            "path_index": path_index,
+            "rename_index": rename_index,
+            "search": {
+                name: yamp.search.documents(library, [record], search_entries)
+                for name, (record, _) in sections.items()
+            },
+        }
+        output.write(
+            output_dir.joinpath(yamp.shard.FILENAME),
+            json.dumps(fragment, indent=0, sort_keys=True),
+        )
+    output.save()
+    if not incremental:
+        writer.prune(output_dir)
+    if use_cache:
+        parsing.save(library)
+
+    if verbose:
+        cache = utils.resolution_cache
+        print(f"Method resolution cache: {cache.hits} hits, {cache.misses} misses")
+
+    if errors_path:
+        with open(errors_path, "w") as file:
+            json.dump({"examples": failures, "errors": errors}, file, indent=2)
+    return {"examples": failures, "errors": errors}
+
+
+def merge_shards(
+    shard_dirs,
+    docs_dir: pathlib.Path,
+    inventory=False,
+    writer=None,
+    verbose=False,
+):
+    """Assembles the API reference from the outputs of the shards, and linkifies the docs.
+
+    The library doesn't have to be importable, as the shards provide everything that is needed.
+    The link index is saved along with the docs if `inventory` is set.
+
+    """
+
+    writer = writer or Writer()
+    fragments = [yamp.shard.load(shard_dir) for shard_dir in shard_dirs]
+    library = fragments[0]["library"]
+    count = fragments[0]["shards"]
+    found = sorted(fragment["shard"] for fragment in fragments)
+    if found != list(range(count)) or any(
+        (f["library"], f["shards"], f["modules"])
+        != (library, count, fragments[0]["modules"])
+        for f in fragments
+    ):
+        raise ValueError(
+            f"Expected the {count} shards of a single build, found shards "
+            + ", ".join(
+                f"{f['library']} {f['shard'] + 1}/{f['shards']}" for f in fragments
+            )
+        )
 
-    # Sub-modules
-    for name, submod in inspect.getmembers(mod, inspect.ismodule):
-        # We only want to go through the public submodules, such as optim.schedulers
-        if (
-            name in ("tags", "typing", "inspect", "skmultiflow_utils")
-            or name not in mod.__all__
-            or name.startswith("_")
-        ):
-            continue
+    output_dir = docs_dir.joinpath("api")
+    output = manifest.Manifest(output_dir, writer=writer)
+    output.write(output_dir.joinpath(".pages"), API_PAGES)
 
+    sections = {}
+    search = {}
+    path_index, rename_index = {}, {}
+    for shard_dir, fragment in zip(shard_dirs, fragments):
+        shard_dir = pathlib.Path(shard_dir)
         if verbose:
-            print(f"{mod_name}.{name}")
+            print(f"Merging shard {fragment['shard'] + 1}/{count} from {shard_dir}")
+        for page in _walk_docs(shard_dir, exclude=[]):
+            merged_page = output_dir.joinpath(page.relative_to(shard_dir))
+            writer.copy(page, merged_page)
+            output.record(merged_page, "")
+        sections.update(fragment["sections"])
+        search.update(fragment.get("search", {}))
+        path_index.update(fragment["path_index"])
+        rename_index.update(fragment["rename_index"])
+
+    overview = md.h1("Overview") + "\n"
+    overview += "".join(sections[name] for name in fragments[0]["modules"])
+    output.write(output_dir.joinpath("overview.md"), overview)
+    output.write(
+        output_dir.joinpath(yamp.search.FILENAME),
+        yamp.search.dump(
+            [row for name in fragments[0]["modules"] for row in search.get(name, [])],
+            library=library,
+            version=fragments[0].get("library_version"),
+        ),
+    )
+    output.save()
+    writer.prune(output_dir)
 
-        print_module(
-            mod=submod,
-            path=mod_path,
-            overview=overview,
-            is_submodule=True,
+    linkify_docs(
+        library=library,
+        docs_dir=docs_dir,
+        linkifier=Linkifier.from_index(library, path_index, rename_index),
+        inventory=inventory,
+        library_version=fragments[0].get("library_version") or "",
+        writer=writer,
+        verbose=verbose,
+    )
+
+
+def render_ir(
+    ir_path,
+    docs_dir: pathlib.Path,
+    store=None,
+    inventory=False,
+    fmt="markdown",
+    writer=None,
+    verbose=False,
+):
+    """Builds the docs from an intermediate representation saved by `print_library`.
+
+    The library doesn't have to be importable, as the IR contains everything that is needed. If a
+    store is provided, the pages of the objects which have been rendered before are reused. The
+    link index is saved along with the docs if `inventory` is set.
+
+    The API reference is rendered in `fmt`, which is either "markdown" or "html". HTML pages are
+    fragments, which link to each other, and which are copied as they are to the linkified
+    directory.
+
+    """
+
+    writer = writer or Writer()
+    header, *records = ir.load(ir_path)
+    library = header["library"]
+    index = next((record for record in records if record["kind"] == "index"), None)
+    if index is None:
+        raise ValueError(f"{ir_path} doesn't contain a link index")
+    if fmt == "markdown":
+        target = rendering.MARKDOWN
+    elif fmt == "html":
+        target = rendering.HTML(
+            symbols.SymbolTable.from_index(
+                library, index["path_index"], index["rename_index"]
+            ),
+            pages={
+                record["path"]
+                for record in records
+                if record["kind"] not in ("module", "index")
+            },
+        )
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected markdown or html")
+
+    output_dir = docs_dir.joinpath("api")
+    output = manifest.Manifest(output_dir, writer=writer)
+    if fmt == "markdown":
+        output.write(output_dir.joinpath(".pages"), API_PAGES)
+
+    def write_pages(module):
+        if fmt != "markdown":
+            return
+        output.write(
+            output_dir.joinpath(module["path"], ".pages"), f"title: {module['name']}"
+        )
+        for submodule in module["submodules"]:
+            if "alias" not in submodule:
+                write_pages(submodule)
+
+    overview = []
+    target.title({"name": "Overview"}, overview.append)
+    modules = []
+    search_entries = {}
+    for record in records:
+        if record["kind"] == "module":
+            write_pages(record)
+            overview.append(target.module(record))
+            modules.append(record)
+        elif record["kind"] != "index":
+            location = record["path"]
+            if record["kind"] != "alias":
+                search_entries[location] = yamp.search.fields(record)
+            if verbose:
+                print(f"Rendering {location}")
+            page = output_dir.joinpath(location).with_suffix(target.suffix)
+            if record["kind"] == "alias":
+                text = target.alias(record["name"], record["canonical"], location)
+            elif store and fmt == "markdown":
+                # The location of a page doesn't change its content
+                key = manifest.digest(
+                    "render",
+                    ir.VERSION,
+                    json.dumps({**record, "path": None}, sort_keys=True),
+                )
+                text = store.memoize(key, functools.partial(ir.render, record))
+            else:
+                with profiling.profiler.stage("render"):
+                    text = target.page(record, location)
+            output.write(page, text)
+    output.write(
+        output_dir.joinpath("overview").with_suffix(target.suffix), "".join(overview)
+    )
+    output.write(
+        output_dir.joinpath(yamp.search.FILENAME),
+        yamp.search.dump(
+            yamp.search.documents(library, modules, search_entries),
+            library=library,
+            version=header.get("library_version"),
+        ),
+    )
+    output.save()
+    writer.prune(output_dir)
+
+    linkify_docs(
+        library=library,
+        docs_dir=docs_dir,
+        linkifier=Linkifier.from_index(
+            library, index["path_index"], index["rename_index"]
+        ),
+        store=store,
+        inventory=inventory,
+        library_version=header.get("library_version") or "",
+        writer=writer,
+        verbose=verbose,
+    )
+
+
+def build_versions(versions, out_dir: pathlib.Path, writer=None, verbose=False):
+    """Builds the docs of several versions of a library, from their IRs.
+
+    `versions` is a list of (name, IR path) pairs. Each version is built in its own directory,
+    next to the versions which have been built before. The files are hard links to a
+    content-addressed store, so that a file which is shared by several versions only takes up
+    space once. Pages are only rendered and linkified if they haven't been for another version.
+    The writer, if provided, has to be a `yamp.store.StoreWriter`.
+
+    """
+
+    writer = writer or yamp.store.StoreWriter(
+        yamp.store.Store(out_dir.joinpath(".yamp-store"))
+    )
+    store = writer.store
+    for name, ir_path in versions:
+        if verbose:
+            print(f"Building version {name} from {ir_path}")
+        render_ir(
+            ir_path,
+            docs_dir=out_dir.joinpath(name),
+            store=store,
+            writer=writer,
             verbose=verbose,
         )
 
-    print("", file=overview)
+    # The most recent versions come first
+    path = out_dir.joinpath("versions.json")
+    try:
+        names = json.loads(path.read_text())
+    except FileNotFoundError:
+        names = []
+    built = [name for name, _ in reversed(versions)]
+    names = built + [name for name in names if name not in built]
+    names = [name for name in names if out_dir.joinpath(name).is_dir()]
+    writer.write(path, json.dumps(names, indent=2))
+
+    if removed := store.gc([out_dir.joinpath(name) for name in names]):
+        if verbose:
+            print(f"Removed {removed} unused files from the store")
+    store.save()
+
 
+def _read_chunks(path, size=CHUNK_SIZE):
+    with open(path) as file:
+        yield from iter(lambda: file.read(size), "")
 
-def print_library(library: str, output_dir: pathlib.Path, verbose=False):
 
-    # Create a directory for the API reference
-    shutil.rmtree(output_dir, ignore_errors=True)
-    os.makedirs(output_dir, exist_ok=True)
-    with open(output_dir.joinpath(".pages"), "w") as f:
-        f.write("title: API reference 🍱\narrange:\n  - overview.md\n  - ...\n")
+def _walk_docs(docs_dir: pathlib.Path, exclude):
+    """Lists the files in the docs, apart from those in the excluded directories.
 
-    overview = open(output_dir.joinpath("overview.md"), "w")
-    print(md.h1("Overview"), file=overview)
+    The state of yamp's builds, such as the manifests, is left out, as it isn't meant to be
+    published.
 
-    for mod_name, mod in inspect.getmembers(
-        importlib.import_module(f"{library}.api"), inspect.ismodule
-    ):
-        if mod_name.startswith("_") or mod_name == "api":
+    """
+    for root, dirs, names in os.walk(docs_dir):
+        root = pathlib.Path(root)
+        dirs[:] = [
+            name
+            for name in dirs
+            if root.joinpath(name) not in exclude and not name.startswith(".yamp")
+        ]
+        for name in names:
+            if name.startswith(".yamp"):
+                continue
+            yield root.joinpath(name)
+
+
+def _linkify_pages(
+    docs_dir: pathlib.Path,
+    exclude,
+    linkifier,
+    output: manifest.Manifest,
+    incremental=False,
+    store=None,
+    inventory=None,
+    verbose=False,
+):
+    """Linkifies the pages of the docs to the directory of a manifest, which records them.
+
+    In incremental mode, the pages are skipped if neither their content nor the index has changed
+    since the previous build. If `inventory` is set, it is the library's version, and the link
+    index is saved along with the pages.
+
+    """
+    writer = output.writer
+    for page in _walk_docs(docs_dir, exclude=exclude):
+        linkified_page = output.root.joinpath(page.relative_to(docs_dir))
+
+        if page.suffix != ".md":
+            writer.copy(page, linkified_page)
+            output.record(linkified_page, "")
+            continue
+
+        # A large page is hashed and linkified in chunks
+        large = page.stat().st_size > STREAM_SIZE
+        if large:
+            digest = manifest.digest(_hash(page), linkifier.digest)
+        else:
+            with profiling.profiler.stage("io"):
+                text = page.read_text()
+            digest = manifest.digest(text, linkifier.digest)
+        if incremental and output.is_fresh(linkified_page, digest):
+            output.keep(linkified_page, digest)
             continue
+
         if verbose:
-            print(mod_name)
-        print_module(mod, path=output_dir, overview=overview, verbose=verbose)
+            print(f"Adding links to {page}")
+
+        if large:
+            with profiling.profiler.stage("linkify"):
+                writer.write_chunks(
+                    linkified_page, linkifier.linkify_chunks(_read_chunks(page))
+                )
+            output.record(linkified_page, digest)
+            continue
+
+        if store:
+            key = manifest.digest("linkify", text, linkifier.digest)
+            text = store.memoize(key, functools.partial(linkifier.linkify, text))
+        else:
+            text = linkifier.linkify(text)
 
+        output.write(linkified_page, text, source_digest=digest)
+
+    if inventory is not None:
+        output.write(
+            output.root.joinpath(yamp.inventory.FILENAME),
+            yamp.inventory.dump(
+                *linkifier.symbols.index(),
+                library=linkifier.library,
+                version=inventory,
+            ),
+        )
 
-def linkify_docs(library: str, docs_dir: pathlib.Path, verbose=False):
 
-    shutil.rmtree(docs_dir.joinpath("linkified"), ignore_errors=True)
-    shutil.copytree(
-        src=docs_dir, dst=docs_dir.joinpath("linkified"), dirs_exist_ok=True
+def linkify_docs(
+    library: str,
+    docs_dir: pathlib.Path,
+    incremental=False,
+    use_cache=False,
+    static=False,
+    linkifier=None,
+    store=None,
+    inventory=False,
+    library_version=None,
+    writer=None,
+    verbose=False,
+):
+    """Linkifies the docs, which are written to the linkified directory.
+
+    In incremental mode, the pages are skipped if neither their content nor the index has changed
+    since the previous build. If `inventory` is set, the link index is saved along with them, so
+    that other projects can link to the API reference. It holds the library's version, which is
+    looked up if it isn't provided.
+
+    """
+
+    writer = writer or Writer()
+    linkified_dir = docs_dir.joinpath("linkified")
+    linkifier = linkifier or Linkifier(
+        library=library, use_cache=use_cache, static=static
     )
-    linkifier = Linkifier(library=library)
+    if inventory and library_version is None:
+        library_version = _library_version(library, static=static)
 
-    for page in docs_dir.glob("**/*.md"):
+    output = manifest.Manifest(
+        linkified_dir, writer=writer, filename=LINKIFIED_MANIFEST
+    )
+    _linkify_pages(
+        docs_dir,
+        exclude=[linkified_dir],
+        linkifier=linkifier,
+        output=output,
+        incremental=incremental,
+        store=store,
+        inventory=library_version if inventory else None,
+        verbose=verbose,
+    )
 
-        # Ignore files in the linkified directory
-        if str(page).startswith("docs/linkified"):
-            continue
+    # Remove the files whose source has been deleted
+    output.save()
+    writer.prune(linkified_dir)
+
+
+def build_docs(
+    library: str,
+    docs_dir: pathlib.Path,
+    incremental=False,
+    jobs=1,
+    static=False,
+    use_cache=False,
+    linkifier=None,
+    ir_path=None,
+    verify=False,
+    embed_outputs=False,
+    timeout=None,
+    memory=None,
+    errors_path=None,
+    inventory=False,
+    writer=None,
+    verbose=False,
+):
+    """Builds the API reference and linkifies the docs in a single pass.
+
+    This is equivalent to calling `print_library` and then `linkify_docs`, except that the API
+    pages are linkified in memory and only get written to the linkified directory. The other pages
+    are linkified one by one, and in incremental mode they are skipped if neither their content
+    nor the index has changed since the previous build. The problems are returned, as by
+    `print_library`. The link index is saved along with the docs if `inventory` is set.
+
+    """
+
+    writer = writer or Writer()
+    linkified_dir = docs_dir.joinpath("linkified")
+    api_dir = docs_dir.joinpath("api")
+
+    linkifier = linkifier or Linkifier(
+        library=library, use_cache=use_cache, static=static
+    )
 
-        text = page.read_text()
+    problems = print_library(
+        library=library,
+        output_dir=linkified_dir.joinpath("api"),
+        incremental=incremental,
+        jobs=jobs,
+        static=static,
+        use_cache=use_cache,
+        linkifier=linkifier,
+        ir_path=ir_path,
+        verify=verify,
+        embed_outputs=embed_outputs,
+        timeout=timeout,
+        memory=memory,
+        errors_path=errors_path,
+        writer=writer,
+        verbose=verbose,
+    )
 
-        if "benchmarks" not in str(page):
-            if verbose:
-                print(f"Adding links to {page}")
-            text = linkifier.linkify(text)
+    # The API reference has its own manifest, this one is for the rest of the docs
+    output = manifest.Manifest(linkified_dir, writer=writer)
+    _linkify_pages(
+        docs_dir,
+        exclude=[linkified_dir, api_dir],
+        linkifier=linkifier,
+        output=output,
+        incremental=incremental,
+        inventory=_library_version(library, static=static) if inventory else None,
+        verbose=verbose,
+    )
 
-        # Write back text to file
-        linkified_page = pathlib.Path(str(page).replace("docs/", "docs/linkified/"))
-        linkified_page.write_text(text)
+    output.save()
+    if not incremental:
+        writer.prune(linkified_dir)
+
+    return problems
+
+
+def watch_docs(
+    library: str,
+    docs_dir: pathlib.Path,
+    pipeline=False,
+    incremental=False,
+    jobs=1,
+    static=False,
+    use_cache=False,
+    interval=0.5,
+    verbose=False,
+):
+    """Builds the docs, and then rebuilds them whenever the library's source code changes.
+
+    The library and the link index are kept in memory. When a source file is edited, only the
+    affected modules are reloaded, and only the pages whose object has changed are rendered again.
+    This runs until it is interrupted.
+
+    """
+
+    def build(incremental, jobs):
+        writer = Writer()
+        if pipeline:
+            build_docs(
+                library=library,
+                docs_dir=docs_dir,
+                incremental=incremental,
+                jobs=jobs,
+                static=static,
+                use_cache=use_cache,
+                linkifier=linkifier,
+                writer=writer,
+                verbose=verbose,
+            )
+        else:
+            print_library(
+                library=library,
+                output_dir=docs_dir.joinpath("api"),
+                incremental=incremental,
+                jobs=jobs,
+                static=static,
+                use_cache=use_cache,
+                writer=writer,
+                verbose=verbose,
+            )
+            linkify_docs(
+                library=library,
+                docs_dir=docs_dir,
+                incremental=incremental,
+                linkifier=linkifier,
+                writer=writer,
+                verbose=verbose,
+            )
+        return writer
+
+    watcher = watch.Watcher(library, static=static)
+    linkifier = Linkifier(library=library, use_cache=use_cache, static=static)
+    print(f"Files: {build(incremental=incremental, jobs=jobs).report()}")
+    print(f"Watching {library} for changes")
+
+    while True:
+        try:
+            time.sleep(interval)
+            changes = watcher.changes()
+            if not changes:
+                continue
+            tic = time.perf_counter()
+            try:
+                reloaded = watcher.reload(changes)
+                linkifier.refresh()
+                # Few pages have to be rendered, which isn't worth starting worker processes
+                writer = build(incremental=True, jobs=1)
+            except Exception:
+                traceback.print_exc()
+                continue
+            print(
+                f"Reloaded {', '.join(reloaded)} in {time.perf_counter() - tic:.2f}s. "
+                f"Files: {writer.report()}"
+            )
+        except KeyboardInterrupt:
+            return
+
+
+def _run(args):
+    """Builds the docs as requested on the command line, and returns the problems."""
+    exclusions.configure(config.load(args.config).get("exclude"))
+    if args.watch:
+        watch_docs(
+            library=args.library,
+            docs_dir=pathlib.Path(args.out),
+            pipeline=args.pipeline,
+            incremental=args.incremental,
+            jobs=args.jobs,
+            static=args.static,
+            use_cache=args.use_cache,
+            verbose=args.verbose,
+        )
+        return
+    writer = Writer()
+    if args.shard:
+        # The docs are linkified once the shards have been merged
+        problems = print_library(
+            library=args.library,
+            output_dir=pathlib.Path(args.out) / "api",
+            incremental=args.incremental,
+            jobs=args.jobs,
+            static=args.static,
+            use_cache=args.use_cache,
+            shard=yamp.shard.parse(args.shard),
+            index=Linkifier(
+                library=args.library, use_cache=args.use_cache, static=args.static
+            ),
+            ir_path=args.ir,
+            verify=args.verify,
+            embed_outputs=args.embed_outputs,
+            timeout=args.timeout,
+            memory=args.memory and args.memory * 2**20,
+            errors_path=args.errors,
+            writer=writer,
+            verbose=args.verbose,
+        )
+        print(f"Files: {writer.report()}")
+        return problems
+    if args.pipeline:
+        problems = build_docs(
+            library=args.library,
+            docs_dir=pathlib.Path(args.out),
+            incremental=args.incremental,
+            jobs=args.jobs,
+            static=args.static,
+            use_cache=args.use_cache,
+            ir_path=args.ir,
+            verify=args.verify,
+            embed_outputs=args.embed_outputs,
+            timeout=args.timeout,
+            memory=args.memory and args.memory * 2**20,
+            errors_path=args.errors,
+            inventory=args.inventory,
+            writer=writer,
+            verbose=args.verbose,
+        )
+        print(f"Files: {writer.report()}")
+        return problems
+    # The IR holds the link index, which is then reused to linkify the docs
+    linkifier = None
+    if args.ir:
+        linkifier = Linkifier(
+            library=args.library, use_cache=args.use_cache, static=args.static
+        )
+    problems = print_library(
+        library=args.library,
+        output_dir=pathlib.Path(args.out) / "api",
+        incremental=args.incremental,
+        jobs=args.jobs,
+        static=args.static,
+        use_cache=args.use_cache,
+        index=linkifier,
+        ir_path=args.ir,
+        verify=args.verify,
+        embed_outputs=args.embed_outputs,
+        timeout=args.timeout,
+        memory=args.memory and args.memory * 2**20,
+        errors_path=args.errors,
+        writer=writer,
+        verbose=args.verbose,
+    )
+    linkify_docs(
+        library=args.library,
+        docs_dir=pathlib.Path(args.out),
+        incremental=args.incremental,
+        use_cache=args.use_cache,
+        static=args.static,
+        linkifier=linkifier,
+        inventory=args.inventory,
+        writer=writer,
+        verbose=args.verbose,
+    )
+    print(f"Files: {writer.report()}")
+    return problems
+
+
+def _add_output_arguments(parser):
+    parser.add_argument(
+        "--inventory",
+        dest="inventory",
+        action="store_true",
+        help=f"save the link index to {yamp.inventory.FILENAME}, for other projects to link to",
+    )
+    parser.set_defaults(inventory=False)
+
+
+def merge_hook(argv):
+    """Command-line interface of `yamp merge`."""
+    parser = argparse.ArgumentParser(
+        prog="yamp merge", description="assemble the outputs of sharded builds"
+    )
+    parser.add_argument(
+        "shards", nargs="+", help="the API reference directories produced by the shards"
+    )
+    parser.add_argument("--out", default="docs", help="where to dump the docs")
+    _add_output_arguments(parser)
+    parser.add_argument("--verbose", dest="verbose", action="store_true")
+    parser.set_defaults(verbose=False)
+    args = parser.parse_args(argv)
+    writer = Writer()
+    merge_shards(
+        shard_dirs=args.shards,
+        docs_dir=pathlib.Path(args.out),
+        inventory=args.inventory,
+        writer=writer,
+        verbose=args.verbose,
+    )
+    print(f"Files: {writer.report()}")
+
+
+def render_hook(argv):
+    """Command-line interface of `yamp render`."""
+    parser = argparse.ArgumentParser(
+        prog="yamp render",
+        description="build the docs from an IR file, without importing the library",
+    )
+    parser.add_argument("ir", help="the IR file saved by a previous build with --ir")
+    parser.add_argument("--out", default="docs", help="where to dump the docs")
+    parser.add_argument(
+        "--format",
+        dest="fmt",
+        choices=["markdown", "html"],
+        default="markdown",
+        help="the format of the API reference, HTML pages are fragments",
+    )
+    _add_output_arguments(parser)
+    parser.add_argument("--verbose", dest="verbose", action="store_true")
+    parser.set_defaults(verbose=False)
+    args = parser.parse_args(argv)
+    writer = Writer()
+    render_ir(
+        ir_path=args.ir,
+        docs_dir=pathlib.Path(args.out),
+        inventory=args.inventory,
+        fmt=args.fmt,
+        writer=writer,
+        verbose=args.verbose,
+    )
+    print(f"Files: {writer.report()}")
+
+
+def versions_hook(argv):
+    """Command-line interface of `yamp versions`."""
+    parser = argparse.ArgumentParser(
+        prog="yamp versions",
+        description="build the docs of several versions of a library from their IR files",
+    )
+    parser.add_argument(
+        "versions",
+        nargs="+",
+        metavar="[NAME=]IR",
+        help="the IR files, the version is named after the library's version by default",
+    )
+    parser.add_argument("--out", default="site", help="where to dump the versions")
+    parser.add_argument("--verbose", dest="verbose", action="store_true")
+    parser.set_defaults(verbose=False)
+    args = parser.parse_args(argv)
+
+    versions = []
+    for spec in args.versions:
+        name, _, ir_path = spec.rpartition("=")
+        if not name:
+            name = ir.load(ir_path)[0].get("library_version")
+            if not name:
+                parser.error(
+                    f"{ir_path} doesn't hold a version, please name it NAME={ir_path}"
+                )
+        versions.append((name, ir_path))
+
+    out_dir = pathlib.Path(args.out)
+    writer = yamp.store.StoreWriter(yamp.store.Store(out_dir.joinpath(".yamp-store")))
+    build_versions(versions, out_dir, writer=writer, verbose=args.verbose)
+    print(f"Files: {writer.report()}, {len(writer.store)} stored")
 
 
 def cli_hook():
     """Command-line interface."""
+    if sys.argv[1:2] == ["merge"]:
+        merge_hook(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["render"]:
+        render_hook(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["versions"]:
+        versions_hook(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser()
     parser.add_argument("library", nargs="?", help="the library to document")
     parser.add_argument("--out", default="docs", help="where to dump the docs")
-    parser.add_argument("--verbose", dest="verbose", action="store_true")
-    parser.set_defaults(verbose=False)
-    args = parser.parse_args()
-    print_library(
-        library=args.library,
-        output_dir=pathlib.Path(args.out) / "api",
-        verbose=args.verbose,
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        help="only regenerate the pages whose source has changed",
     )
-    linkify_docs(
-        library=args.library, docs_dir=pathlib.Path(args.out), verbose=args.verbose
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="how many processes to use for rendering pages",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="don't use the cache of parsed docstrings and of the link index",
+    )
+    parser.add_argument(
+        "--static",
+        dest="static",
+        action="store_true",
+        help="parse the library's source code instead of importing it, which leaves out "
+        "the base classes from other libraries, see yamp.static",
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="pipeline",
+        action="store_true",
+        help="linkify the API reference as it is generated, without writing it to docs/api",
+    )
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="keep running, and rebuild the docs whenever the library's source changes",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="i/N",
+        help="only build the i-th of N shards, which are then assembled with yamp merge",
+    )
+    parser.add_argument(
+        "--ir",
+        metavar="PATH",
+        help="save the intermediate representation of the API reference, for yamp render",
+    )
+    parser.add_argument(
+        "--verify",
+        dest="verify",
+        action="store_true",
+        help="run the examples of the docstrings, and report those which fail",
+    )
+    parser.add_argument(
+        "--embed-outputs",
+        dest="embed_outputs",
+        action="store_true",
+        help="display the actual outputs of the examples, which implies --verify",
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="time budget of each object, beyond which it gets a placeholder page, "
+        "and of its examples, beyond which they fail",
+    )
+    parser.add_argument(
+        "--memory",
+        type=int,
+        metavar="MB",
+        help="memory budget of each object, beyond which it gets a placeholder page, "
+        "and of its examples, beyond which they fail",
+    )
+    parser.add_argument(
+        "--errors",
+        metavar="PATH",
+        help="save the objects which couldn't be documented and the failed examples as JSON",
+    )
+    _add_output_arguments(parser)
+    parser.add_argument(
+        "--config",
+        metavar="PATH",
+        help="read the configuration from this file instead of the [tool.yamp] table of "
+        "pyproject.toml",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="yamp-profile.json",
+        metavar="REPORT",
+        help="time each stage of the build, and save a JSON report (yamp-profile.json by default)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="how many of the slowest modules and objects are reported with --profile",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="profile the build with cProfile, and save the stats for pstats or snakeviz",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="save the timings as trace events, for chrome://tracing or ui.perfetto.dev",
+    )
+    parser.add_argument("--verbose", dest="verbose", action="store_true")
+    parser.set_defaults(
+        incremental=False,
+        use_cache=True,
+        static=False,
+        pipeline=False,
+        watch=False,
+        verify=False,
+        embed_outputs=False,
+        verbose=False,
+    )
+    args = parser.parse_args()
+    if not (args.profile or args.cprofile or args.trace):
+        if any((_run(args) or {}).values()):
+            sys.exit(1)
+        return
+
+    profiling.profiler.enabled = True
+    profiler = cProfile.Profile() if args.cprofile else None
+    try:
+        if profiler:
+            problems = profiler.runcall(_run, args)
+        else:
+            problems = _run(args)
+    finally:
+        report = profiling.profiler.report(top=args.profile_top)
+        print(profiling.summary(report))
+        if args.profile:
+            profiling.profiler.save_report(args.profile, top=args.profile_top)
+        if args.trace:
+            profiling.profiler.save_trace(args.trace)
+        if profiler:
+            profiler.dump_stats(args.cprofile)
+    if any((problems or {}).values()):
+        sys.exit(1)
@@ -0,0 +1,86 @@
+"""On-disk cache for results which are expensive to compute.
+
+Each entry is stored as a JSON file in the cache directory, together with a key. An entry is only
+returned if it was stored under the same key, which means that stale entries are simply ignored,
+and overwritten by the next call to `save`.
+
+The cache directory is `$YAMP_CACHE_DIR` if set, and otherwise `yamp` in the user's cache
+directory.
+
+"""
+import hashlib
+import importlib.machinery
+import importlib.metadata
+import importlib.util
+import json
+import os
+import pathlib
+from typing import Optional
+
+import yamp
+
+# Bumped whenever the layout of an entry which is keyed by `library_fingerprint` changes
+FORMAT = 2
+
+
+def cache_dir() -> pathlib.Path:
+    if path := os.environ.get("YAMP_CACHE_DIR"):
+        return pathlib.Path(path)
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return pathlib.Path(root).expanduser().joinpath("yamp")
+
+
+def source_files(library: str):
+    """Lists the source files of a library, without importing it."""
+    spec = importlib.util.find_spec(library)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{library}'")
+    if not spec.submodule_search_locations:
+        return [pathlib.Path(spec.origin)] if spec.has_location else []
+    suffixes = tuple(importlib.machinery.all_suffixes())
+    return sorted(
+        pathlib.Path(root, name)
+        for location in spec.submodule_search_locations
+        for root, dirs, names in os.walk(location)
+        if "__pycache__" not in root
+        for name in names
+        if name.endswith(suffixes)
+    )
+
+
+def library_fingerprint(library: str) -> str:
+    """A key which changes whenever the library's version or one of its source files changes,
+    and whenever yamp or the layout of the entries changes."""
+    try:
+        version = importlib.metadata.version(library)
+    except importlib.metadata.PackageNotFoundError:
+        version = ""
+    h = hashlib.sha1(f"{library}\0{version}\0{yamp.__version__}\0{FORMAT}".encode())
+    for path in source_files(library):
+        stat = path.stat()
+        h.update(f"\0{path}\0{stat.st_mtime_ns}\0{stat.st_size}".encode())
+    return h.hexdigest()
+
+
+def _path(name: str, library: str) -> pathlib.Path:
+    return cache_dir().joinpath(f"{library}.{name}.json")
+
+
+def load(name: str, library: str, key: str) -> Optional[dict]:
+    """Returns the cached entry, provided it was stored under the same key."""
+    try:
+        entry = json.loads(_path(name, library).read_text())
+    except (OSError, ValueError):
+        return None
+    if entry.get("key") != key:
+        return None
+    return entry["data"]
+
+
+def save(name: str, library: str, key: str, data: dict):
+    path = _path(name, library)
+    os.makedirs(path.parent, exist_ok=True)
+    # Write to a temporary file first, so that concurrent runs never read a partial entry
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"key": key, "data": data}))
+    os.replace(tmp, path)
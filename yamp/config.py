@@ -0,0 +1,42 @@
+"""Configuration of yamp.
+
+The configuration is read from the [tool.yamp] table of the pyproject.toml file in the current
+directory, if there is one, or else from the file given with --config. For now, it holds the rules
+for leaving out inherited methods, see `yamp.exclusions`:
+
+    [[tool.yamp.exclude]]
+    base = "river.base.Base"
+    methods = ["clone", "mutate"]
+
+A file other than pyproject.toml holds the table at its top level. TOML is read with tomllib,
+which requires Python 3.11, or else with the tomli package.
+
+"""
+import pathlib
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+PYPROJECT = "pyproject.toml"
+
+
+def load(path=None) -> dict:
+    """Loads the configuration from a file, or from pyproject.toml if no file is provided."""
+    if path is None:
+        path = pathlib.Path(PYPROJECT)
+        # The configuration is optional, so not being able to read it is not an error
+        if not path.exists() or tomllib is None:
+            return {}
+    path = pathlib.Path(path)
+    if tomllib is None:
+        raise ValueError(f"Reading {path} requires Python 3.11 or the tomli package")
+    with open(path, "rb") as file:
+        data = tomllib.load(file)
+    if path.name == PYPROJECT:
+        return data.get("tool", {}).get("yamp", {})
+    return data
@@ -0,0 +1,197 @@
+"""Verification of the examples found in docstrings.
+
+The examples of each object are run as a doctest, in the namespace of the module where the object
+is defined, by a pool of worker processes. The outcome of each record is cached on disk, keyed by
+its examples' source and by the library's version. Only the examples which have changed are thus
+run again, while a change to the code they call goes unnoticed until the version is bumped, or
+until the build is run with --no-cache.
+Besides the failures, the actual output of each example is kept, which makes it possible to embed
+it in the page instead of the expected output.
+
+Examples
+--------
+
+>>> record = {
+...     "module": "yamp.utils",
+...     "qualname": "f",
+...     "examples": [">>> snake_to_kebab('a_b')", "'a-b'", ">>> 1 + 1", "3"],
+... }
+>>> outcome = run(record["module"], record["qualname"], source(record))
+>>> outcome["outputs"]
+["'a-b'\\n", '2\\n']
+>>> print(format_failure(f"{record['module']}.{record['qualname']}", outcome["failures"][0]))
+File yamp.utils.f, line 3, in example:
+    1 + 1
+Expected:
+    3
+Got:
+    2
+
+"""
+import concurrent.futures
+import doctest
+import importlib
+import inspect
+import textwrap
+import traceback
+
+import yamp
+from yamp import cache
+from yamp import isolation
+from yamp import manifest
+from yamp import profiling
+
+OPTIONFLAGS = doctest.ELLIPSIS | doctest.NORMALIZE_WHITESPACE
+
+
+def source(record: dict) -> str:
+    """The examples of an IR record, as they are parsed when the page is rendered."""
+    return inspect.cleandoc("\n".join(record["examples"]))
+
+
+class _Runner(doctest.DocTestRunner):
+    """Collects the output of each example, instead of printing a report."""
+
+    def run(self, test, **kwargs):
+        self.index = {id(example): i for i, example in enumerate(test.examples)}
+        self.outputs = [None] * len(test.examples)
+        self.errors = []
+        return super().run(test, out=lambda _: None, **kwargs)
+
+    def report_success(self, out, test, example, got):
+        self.outputs[self.index[id(example)]] = got
+
+    def report_failure(self, out, test, example, got):
+        self.outputs[self.index[id(example)]] = got
+        self.errors.append(
+            {
+                "line": example.lineno + 1,
+                "source": example.source,
+                "want": example.want,
+                "got": got,
+            }
+        )
+
+    def report_unexpected_exception(self, out, test, example, exc_info):
+        got = "Traceback (most recent call last):\n    ...\n" + "".join(
+            traceback.format_exception_only(*exc_info[:2])
+        )
+        self.report_failure(out, test, example, got)
+
+
+def run(module: str, qualname: str, text: str) -> dict:
+    """Runs examples in the namespace of a module, and returns their outputs and failures."""
+    globs = dict(vars(importlib.import_module(module)))
+    test = doctest.DocTestParser().get_doctest(
+        text, globs, name=f"{module}.{qualname}", filename=None, lineno=0
+    )
+    runner = _Runner(verbose=False, optionflags=OPTIONFLAGS)
+    runner.run(test)
+    return {"outputs": runner.outputs, "failures": runner.errors}
+
+
+def _run(task):
+    with profiling.profiler.stage("verify", name=f"{task[0]}.{task[1]}"):
+        return run(*task), profiling.profiler.drain()
+
+
+def _init_worker(profile=False):
+    # A forked worker inherits the measurements of its parent, which mustn't be sent back
+    profiling.profiler.reset()
+    profiling.profiler.enabled = profile
+
+
+def _budget_failure(text: str, error: dict) -> dict:
+    """The outcome of examples which didn't run to completion, such as those which hang."""
+    failure = {"line": 1, "source": text, "want": "", "got": error["message"]}
+    return {"outputs": [], "failures": [failure]}
+
+
+def verify(
+    records,
+    library: str,
+    version: str,
+    jobs=1,
+    use_cache=True,
+    timeout=None,
+    memory=None,
+    verbose=False,
+) -> list:
+    """Runs the examples of IR records, and returns their outcomes, in order.
+
+    The outcome of a record without examples is None. The examples are always run in worker
+    processes, so that they can't alter the state of the build. If a `timeout`, in seconds, or a
+    `memory` budget, in bytes, is provided, the examples of each record are run under these
+    budgets, see `yamp.isolation`. Examples which exceed them fail, and their outcome isn't cached.
+
+    """
+
+    # The outcomes are kept as long as yamp doesn't change, each one under its own key
+    key = yamp.__version__
+    cached = (use_cache and cache.load("examples", library, key=key)) or {}
+
+    digests, tasks = [], {}
+    for record in records:
+        if not record.get("examples"):
+            digests.append(None)
+            continue
+        text = source(record)
+        digest = manifest.digest(record["module"], text, version)
+        digests.append(digest)
+        if digest not in cached:
+            tasks.setdefault(digest, (record["module"], record["qualname"], text))
+
+    outcomes = {}
+    if tasks and (timeout is not None or memory is not None):
+        for (digest, task), (result, error) in zip(
+            tasks.items(),
+            isolation.imap(
+                _run,
+                tasks.values(),
+                jobs=jobs,
+                timeout=timeout,
+                memory=memory,
+                initializer=_init_worker,
+                initargs=(profiling.profiler.enabled,),
+            ),
+        ):
+            if error:
+                outcomes[digest] = _budget_failure(task[2], error)
+                continue
+            outcome, measurements = result
+            cached[digest] = outcome
+            profiling.profiler.merge(measurements)
+    elif tasks:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(jobs, 1),
+            initializer=_init_worker,
+            initargs=(profiling.profiler.enabled,),
+        ) as pool:
+            for digest, (outcome, measurements) in zip(
+                tasks, pool.map(_run, tasks.values())
+            ):
+                cached[digest] = outcome
+                profiling.profiler.merge(measurements)
+
+    if use_cache:
+        cache.save("examples", library, key=key, data=cached)
+    outcomes.update(cached)
+    if verbose:
+        hits = len(set(filter(None, digests))) - len(tasks)
+        print(f"Examples: {len(tasks)} run, {hits} cached")
+
+    return [outcomes[digest] if digest else None for digest in digests]
+
+
+def format_failure(name: str, failure: dict) -> str:
+    indent = lambda text: textwrap.indent(text, "    ").rstrip("\n")
+    return "\n".join(
+        [
+            f"File {name}, line {failure['line']}, in example:",
+            indent(failure["source"]),
+            "Expected:",
+            indent(failure["want"]) if failure["want"] else "    Nothing",
+            "Got:",
+            indent(failure["got"]) if failure["got"] else "    Nothing",
+        ]
+    )
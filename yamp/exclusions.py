@@ -0,0 +1,117 @@
+"""Rules for leaving inherited methods out of the pages of classes.
+
+Some methods are inherited by so many classes that listing them on every page is noise. A rule
+names a base class and some of its methods, which are then left out of the pages of the classes
+that inherit from it, though not from the page of the base class itself.
+
+Bases are matched by name along the method resolution order, so the rules don't require importing
+the libraries they refer to, and they apply in static mode too. A base is named either by the
+module where it is defined, or by a package which exports it: river.base.Base matches the Base
+class defined in river.base.base. The methods which are excluded from a class are only worked out
+once, after which checking a method is a set lookup.
+
+The rules are read from the exclude key of the configuration, see `yamp.config`. By default, they
+are those of River.
+
+Examples
+--------
+
+>>> import yamp.store
+
+>>> rules = Rules([{"base": "yamp.Writer", "methods": ["report", "prune"]}])
+>>> sorted(rules.excluded(yamp.store.StoreWriter))
+['prune', 'report']
+>>> sorted(rules.excluded(yamp.writer.Writer))
+[]
+
+"""
+import inspect
+
+from yamp import manifest
+
+DEFAULT = [
+    {"base": "river.base.Base", "methods": ["clone", "mutate"]},
+    {
+        "base": "river.base.Ensemble",
+        "methods": [
+            "append",
+            "clear",
+            "copy",
+            "count",
+            "extend",
+            "index",
+            "insert",
+            "pop",
+            "remove",
+            "reverse",
+            "sort",
+        ],
+    },
+]
+
+
+def _matches(base: str, klass) -> bool:
+    module, _, name = base.rpartition(".")
+    if f"{klass.__module__}.{klass.__qualname__}" == base:
+        return True
+    return klass.__qualname__ == name and klass.__module__.startswith(f"{module}.")
+
+
+class Rules:
+    """A set of exclusion rules.
+
+    Parameters
+    ----------
+    config
+        A list of rules, each of which is a dict with a "base" and a list of "methods". The
+        default rules are used if it is None.
+
+    """
+
+    def __init__(self, config: list = None):
+        self.config = DEFAULT if config is None else config
+        if not isinstance(self.config, list):
+            raise ValueError(f"Expected a list of exclusion rules, got {self.config!r}")
+        self.rules = []
+        for rule in self.config:
+            if not (
+                isinstance(rule, dict)
+                and isinstance(rule.get("base"), str)
+                and isinstance(rule.get("methods"), list)
+            ):
+                raise ValueError(
+                    f"Invalid exclusion rule {rule!r}, expected a base and a list of methods"
+                )
+            self.rules.append((rule["base"], frozenset(rule["methods"])))
+        self.tables = {}
+
+    @property
+    def digest(self) -> str:
+        # The order of a set changes from one process to the next
+        return manifest.digest(
+            *((base, sorted(methods)) for base, methods in self.rules)
+        )
+
+    def excluded(self, klass) -> frozenset:
+        """The methods which are left out of the page of a class."""
+        if (table := self.tables.get(klass)) is not None:
+            return table
+        table = frozenset().union(
+            *(
+                methods
+                for ancestor in inspect.getmro(klass)[1:]
+                for base, methods in self.rules
+                if _matches(base, ancestor)
+            )
+        )
+        self.tables[klass] = table
+        return table
+
+
+rules = Rules()
+
+
+def configure(config: list = None):
+    """Replaces the rules which are used to describe classes."""
+    global rules
+    rules = Rules(config)
@@ -0,0 +1,64 @@
+"""Inventory of the API reference, which lets other projects link to it.
+
+The inventory holds the link index, which is every name under which a module, a class or a
+function can be mentioned, along with its page and the name it is displayed with. Another project
+can load it to link to the API reference, without having to import the library.
+
+The layout is that of the objects.inv files of Sphinx: a few header lines, followed by one line per
+name, which are sorted and compressed with zlib. Names which are displayed as they are have a dash
+as their display name, and pages are relative to the root of the docs.
+
+Examples
+--------
+
+>>> path_index = {"zoo.animals": "animals", "zoo.animals.Dog": "animals/Dog"}
+>>> rename_index = {"zoo.animals.Dog": "animals.Dog"}
+
+>>> data = dump(path_index, rename_index, library="zoo", version="1.0")
+>>> data.split(b"\\n")[1]
+b'# Project: zoo'
+>>> print(zlib.decompress(data.split(b"\\n", 4)[4]).decode("utf-8"), end="")
+zoo.animals py:module 1 api/animals/ -
+zoo.animals.Dog py:obj 1 api/animals/Dog/ animals.Dog
+
+>>> load(data) == (path_index, rename_index)
+True
+
+"""
+import zlib
+
+FILENAME = "objects.inv"
+HEADER = "# Sphinx inventory version 2"
+
+
+def dump(path_index: dict, rename_index: dict, library: str, version=None) -> bytes:
+    """Serializes a link index. Modules are the names which are not renamed."""
+    header = [
+        HEADER,
+        f"# Project: {library}",
+        f"# Version: {version or ''}",
+        "# The remainder of this file is compressed using zlib.",
+    ]
+    lines = []
+    for name, path in sorted(path_index.items()):
+        role = "py:obj" if name in rename_index else "py:module"
+        display = rename_index.get(name, name)
+        lines.append(
+            f"{name} {role} 1 api/{path}/ {'-' if display == name else display}\n"
+        )
+    body = zlib.compress("".join(lines).encode("utf-8"), 9)
+    return "\n".join(header).encode("utf-8") + b"\n" + body
+
+
+def load(data: bytes):
+    """Deserializes a link index, as a (path_index, rename_index) pair."""
+    *header, body = data.split(b"\n", 4)
+    if len(header) < 4 or header[0].decode("utf-8") != HEADER:
+        raise ValueError("Not an inventory in version 2")
+    path_index, rename_index = {}, {}
+    for line in zlib.decompress(body).decode("utf-8").splitlines():
+        name, role, _, uri, display = line.split(" ", 4)
+        path_index[name] = uri[len("api/") : -len("/")]
+        if role != "py:module":
+            rename_index[name] = name if display == "-" else display
+    return path_index, rename_index
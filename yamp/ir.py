@@ -0,0 +1,197 @@
+"""Intermediate representation of the API reference.
+
+Building the API reference happens in two steps. First, the library is introspected, and each
+class and function is described by a record, which is made of plain lists, dicts and strings.
+Second, the records are rendered to Markdown, by `yamp.rendering`. Only the first step requires the
+library, and it is by far the most expensive one. The records can be saved to a file, along with
+the overview and the link index, and the docs can then be rebuilt from that file alone, for
+instance in another CI job.
+A record may also hold the actual outputs of its examples, which are then displayed instead of the
+expected ones. The record of an object which couldn't be described holds the error instead, and its
+page is a placeholder.
+
+The file is in the JSON lines format. The first line is a header, which holds the version of the
+format. It is followed by a line per top-level module, a line per page, and a line for the link
+index. The version is bumped whenever the records change in a way that isn't backwards compatible.
+
+Examples
+--------
+
+>>> import json
+>>> from yamp.registry import Registry
+
+>>> record = describe(Registry)
+>>> record["kind"], record["name"]
+('class', 'Registry')
+>>> record["parameters"]
+[{'name': 'library', 'annotation': 'str', 'default': None, 'description': 'The name of the library. Locations are relative to it, with slashes instead of dots.'}]
+>>> [method["name"] for method in record["methods"]]
+['add', 'add_tree', 'canonical', 'locations']
+
+>>> render(json.loads(json.dumps(record))) == render(record)
+True
+
+"""
+import inspect
+import json
+
+from yamp import exclusions
+from yamp import rendering
+from yamp import utils
+from yamp.parsing import ClassDoc, FunctionDoc
+from yamp.rendering import concat_lines
+
+VERSION = 1
+
+
+def _describe_method(obj, name: str, params_desc: dict) -> dict:
+    # Parse method docstring
+    docstring = utils.find_method_docstring(klass=obj, method=name)
+    if not docstring:
+        return {"name": name}
+    meth_doc = FunctionDoc(func=None, doc=docstring)
+
+    # We infer the type annotations from the signatures, and therefore rely on the signature
+    # instead of the docstring for documenting parameters
+    signature = utils.find_method_signature(obj, name)
+    parameters = [
+        {
+            "name": param.name,
+            "annotation": None
+            if param.annotation is param.empty
+            else f"{inspect.formatannotation(param.annotation)}",
+            "default": None if param.default is param.empty else f"{param.default}",
+            "description": params_desc.get(param.name),
+        }
+        for param in signature.parameters.values()
+    ]
+
+    returns = None
+    if meth_doc["Returns"]:
+        annotation = signature.return_annotation
+        if annotation is inspect._empty:
+            annotation = None
+        elif inspect.isclass(annotation):
+            annotation = annotation.__name__
+        else:
+            annotation = f"{annotation}"
+        returns = {"annotation": annotation, "type": meth_doc["Returns"][0].type}
+
+    return {
+        "name": name,
+        "summary": meth_doc["Summary"],
+        "extended_summary": meth_doc["Extended Summary"],
+        "parameters": parameters,
+        "returns": returns,
+    }
+
+
+def describe(obj) -> dict:
+    """Describes a class or a function, with everything that goes into its page.
+
+    Annotations and default values are stored as they are displayed.
+
+    """
+
+    doc = ClassDoc(obj) if inspect.isclass(obj) else FunctionDoc(obj)
+
+    # We infer the type annotations from the signatures, and therefore rely on the signature
+    # instead of the docstring for documenting parameters
+    try:
+        signature = inspect.signature(obj)
+    except ValueError:
+        signature = (
+            inspect.Signature()
+        )  # TODO: this is necessary for Cython classes, but it's not correct
+    params_desc = {param.name: " ".join(param.desc) for param in doc["Parameters"]}
+
+    parameters = [
+        {
+            "name": param.name,
+            "annotation": None
+            if param.annotation is param.empty
+            else inspect.formatannotation(param.annotation).strip("'"),
+            "default": None if param.default is param.empty else f"{param.default}",
+            "description": params_desc[param.name],
+        }
+        for param in signature.parameters.values()
+    ]
+
+    # The methods of a class are documented with the parameters of the class, which are those
+    # which are found in its docstring
+    methods = None
+    if inspect.isclass(obj) and doc["Methods"]:
+        excluded = exclusions.rules.excluded(obj)
+        methods = [
+            _describe_method(obj, meth.name, params_desc)
+            for meth in doc["Methods"]
+            if meth.name not in excluded
+        ]
+
+    return {
+        "kind": "class" if inspect.isclass(obj) else "function",
+        "name": obj.__name__,
+        "module": obj.__module__,
+        "qualname": obj.__qualname__,
+        "summary": doc["Summary"],
+        "extended_summary": doc["Extended Summary"],
+        "parameters": parameters,
+        "attributes": [
+            {"name": attr.name, "type": attr.type, "description": " ".join(attr.desc)}
+            for attr in doc["Attributes"]
+        ],
+        "examples": doc["Examples"],
+        "methods": methods,
+        "notes": doc["Notes"],
+        "references": doc["References"],
+    }
+
+
+def placeholder(obj, error: dict) -> dict:
+    """The record of an object which couldn't be described, along with the error."""
+    return {
+        "kind": "class" if inspect.isclass(obj) else "function",
+        "name": obj.__name__,
+        "module": obj.__module__,
+        "qualname": obj.__qualname__,
+        "error": error,
+    }
+
+
+def print_record(record: dict, file):
+    """Prints the page of a class or a function to a file."""
+    file.write(render(record))
+
+
+def render(record: dict) -> str:
+    """Returns the Markdown page of a class or a function."""
+    return rendering.MARKDOWN.page(record)
+
+
+def print_module(record: dict, file):
+    """Prints the section of the overview which is dedicated to a module."""
+    file.write(render_module(record))
+
+
+def render_module(record: dict) -> str:
+    return rendering.MARKDOWN.module(record)
+
+
+def save(path, records, **header):
+    """Saves records to a file, one per line, after a header which holds the given metadata."""
+    with open(path, "w") as file:
+        for record in [{"kind": "header", "version": VERSION, **header}, *records]:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load(path) -> list:
+    """Loads the records of a file, and checks that their version is supported."""
+    with open(path) as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    if not records or records[0].get("kind") != "header":
+        raise ValueError(f"{path} is not a yamp IR file")
+    if (version := records[0].get("version")) != VERSION:
+        raise ValueError(
+            f"{path} is in version {version} of the IR, whereas yamp reads version {VERSION}"
+        )
+    return records
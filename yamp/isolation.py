@@ -0,0 +1,237 @@
+"""Running tasks in worker processes, each one under a time and a memory budget.
+
+A worker which exceeds the time budget is killed, as is one which crashes, and it is replaced by a
+fresh worker, so that the other tasks aren't affected. The memory budget is enforced by limiting the
+address space of the worker while it runs a task, which makes allocations beyond the budget raise a
+`MemoryError`. This is only possible on platforms which have the resource module and /proc, such
+as Linux. Elsewhere, the memory budget is ignored.
+
+A task which doesn't succeed produces an error, which is a dict with the reason of the failure,
+which is one of "exception", "memory", "timeout" and "crash", as well as a message and, for
+exceptions, a traceback.
+
+Examples
+--------
+
+>>> import math
+
+>>> for value, error in imap(math.sqrt, [4, -1, 9], jobs=2, timeout=10):
+...     print(value, error and error["message"])
+2.0 None
+None ValueError: math domain error
+3.0 None
+
+"""
+import collections
+import contextlib
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def error(exception: BaseException) -> dict:
+    """Describes the exception raised by a task."""
+    return {
+        "reason": "memory" if isinstance(exception, MemoryError) else "exception",
+        "message": "".join(
+            traceback.format_exception_only(type(exception), exception)
+        ).strip(),
+        "traceback": "".join(
+            traceback.format_exception(
+                type(exception), exception, exception.__traceback__
+            )
+        ),
+    }
+
+
+def _address_space():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def _budget(memory):
+    """Limits the memory which can be allocated on top of what is already in use."""
+    if not memory or resource is None or (used := _address_space()) is None:
+        yield
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = used + memory
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _serve(conn, initializer, initargs, memory):
+    if initializer:
+        initializer(*initargs)
+    # The time budget only starts once the worker is ready
+    conn.send(None)
+    while (task := conn.recv()) is not None:
+        func, arg = task
+        exception = None
+        with _budget(memory):
+            try:
+                value = func(arg)
+            except Exception as e:
+                exception = e
+        # The exception is described outside of the budget, which may have been exhausted
+        conn.send((None, error(exception)) if exception else (value, None))
+
+
+class _Worker:
+    def __init__(self, context, initializer, initargs, memory):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, initializer, initargs, memory), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.task = None
+        self.deadline = None
+
+    def stop(self, kill=False):
+        if kill or not self.ready or self.task is not None:
+            self.process.kill()
+        else:
+            with contextlib.suppress(OSError):
+                self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+
+class Pool:
+    """Worker processes which run tasks under a time and a memory budget.
+
+    The workers are started when they are first needed, and are reused from one call of `imap` to
+    the next. Each worker runs `initializer(*initargs)` once it is started, which doesn't count
+    towards the budget of its first task.
+
+    Parameters
+    ----------
+    jobs
+        The number of workers.
+    timeout
+        The time budget of each task, in seconds.
+    memory
+        The memory budget of each task, in bytes.
+
+    """
+
+    def __init__(
+        self, jobs=1, timeout=None, memory=None, initializer=None, initargs=()
+    ):
+        self.jobs = max(jobs, 1)
+        self.timeout = timeout
+        self.memory = memory
+        self.initializer = initializer
+        self.initargs = initargs
+        self.context = multiprocessing.get_context()
+        self.workers = []
+
+    def _spawn(self):
+        return _Worker(self.context, self.initializer, self.initargs, self.memory)
+
+    def imap(self, func, args):
+        """Applies `func` to each argument, and yields (value, error) pairs, in order."""
+
+        args = list(args)
+        workers = self.workers
+        while len(workers) < min(self.jobs, len(args)):
+            workers.append(self._spawn())
+        pending = collections.deque(range(len(args)))
+        results = {}
+        position = 0
+
+        def replace(i, task_error):
+            results[workers[i].task] = (None, {**task_error, "traceback": None})
+            workers[i].stop(kill=True)
+            workers[i] = self._spawn()
+
+        try:
+            while position < len(args):
+                # Hand out tasks to the idle workers
+                for worker in workers:
+                    if worker.ready and worker.task is None and pending:
+                        worker.task = pending.popleft()
+                        worker.conn.send((func, args[worker.task]))
+                        if self.timeout is not None:
+                            worker.deadline = time.monotonic() + self.timeout
+
+                deadlines = [w.deadline for w in workers if w.task is not None]
+                deadlines = [deadline for deadline in deadlines if deadline]
+                wait = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+                ready = multiprocessing.connection.wait([w.conn for w in workers], wait)
+
+                for i, worker in enumerate(workers):
+                    if worker.conn not in ready:
+                        continue
+                    try:
+                        message = worker.conn.recv()
+                    except EOFError:
+                        worker.process.join()
+                        code = worker.process.exitcode
+                        if not worker.ready:
+                            raise RuntimeError(
+                                f"A worker failed to start, with exit code {code}"
+                            )
+                        replace(
+                            i,
+                            {"reason": "crash", "message": f"Exited with code {code}"},
+                        )
+                        continue
+                    if not worker.ready:
+                        worker.ready = True
+                        continue
+                    results[worker.task] = message
+                    worker.task = worker.deadline = None
+
+                now = time.monotonic()
+                for i, worker in enumerate(workers):
+                    if worker.task is None or not worker.deadline:
+                        continue
+                    if worker.deadline <= now:
+                        message = f"Took more than {self.timeout}s"
+                        replace(i, {"reason": "timeout", "message": message})
+
+                while position in results:
+                    yield results.pop(position)
+                    position += 1
+        finally:
+            # The workers which are busy with the tasks of an interrupted call are stopped
+            for worker in workers:
+                if worker.task is not None:
+                    worker.stop(kill=True)
+            workers[:] = [worker for worker in workers if worker.task is None]
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def imap(func, args, jobs=1, timeout=None, memory=None, initializer=None, initargs=()):
+    """Applies `func` to each argument in a pool of workers. See `Pool`."""
+    with Pool(jobs, timeout, memory, initializer, initargs) as pool:
+        yield from pool.imap(func, args)
@@ -0,0 +1,147 @@
+"""Bookkeeping for incremental builds.
+
+The manifest is a JSON file which lives next to the generated files. It maps each generated file
+to a digest of whatever was used to produce it. On the next build, a file whose digest hasn't
+changed is left untouched, and files which are not produced anymore are deleted.
+
+"""
+import functools
+import hashlib
+import inspect
+import json
+import pathlib
+
+from yamp.writer import Writer
+
+FILENAME = ".yamp-manifest.json"
+
+
+def digest(*parts) -> str:
+    """Hash a sequence of objects via their string representation.
+
+    Examples
+    --------
+
+    >>> digest("foo", 42) == digest("foo", 42)
+    True
+
+    >>> digest("foo", 42) == digest("foo4", 2)
+    False
+
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(str(part).encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _signature(obj) -> str:
+    try:
+        return str(inspect.signature(obj))
+    except (TypeError, ValueError):
+        return ""
+
+
+@functools.lru_cache(maxsize=None)
+def _ancestor_digest(ancestor) -> str:
+    parts = [ancestor.__module__, ancestor.__qualname__, ancestor.__doc__]
+    for name, member in sorted(vars(ancestor).items()):
+        if inspect.isroutine(member) or isinstance(member, property):
+            parts.extend((name, member.__doc__, _signature(member)))
+    return digest(*parts)
+
+
+def clear():
+    """Forgets the digests of the ancestors, which are only reused within a build."""
+    _ancestor_digest.cache_clear()
+
+
+def fingerprint(obj, version: str) -> str:
+    """Digest of everything which goes into the page of a class or a function.
+
+    For a class, the docstrings and signatures of every ancestor's members are included, because
+    methods inherit their docstring and annotations from their parents. The digest of each
+    ancestor is memoized, as sibling classes share most of their ancestors. Builtins such as
+    object are left out, as they don't change and their slot wrappers are slow to inspect.
+
+    """
+    parts = [version, obj.__module__, obj.__qualname__, obj.__doc__, _signature(obj)]
+    if inspect.isclass(obj):
+        parts.extend(
+            _ancestor_digest(ancestor)
+            for ancestor in inspect.getmro(obj)
+            if ancestor.__module__ != "builtins"
+        )
+    return digest(*parts)
+
+
+class Manifest:
+    """Keeps track of the files generated in a directory.
+
+    Parameters
+    ----------
+    root
+        The directory which contains the generated files.
+    writer
+        The writer which is used to write and delete files.
+    filename
+        The name of the manifest, which tells apart the manifests of different builds which share
+        a directory.
+
+    """
+
+    def __init__(self, root: pathlib.Path, writer: Writer = None, filename=FILENAME):
+        self.root = pathlib.Path(root)
+        self.writer = writer or Writer()
+        self.filename = filename
+        try:
+            text = self.writer.read(self.root.joinpath(filename))
+            self.old = json.loads(text)["files"]
+        except (FileNotFoundError, KeyError, ValueError):
+            self.old = {}
+        self.new = {}
+
+    def _key(self, path) -> str:
+        return pathlib.Path(path).relative_to(self.root).as_posix()
+
+    def is_fresh(self, path, digest: str) -> bool:
+        """Whether a file exists and was generated from the same inputs."""
+        return self.old.get(self._key(path)) == digest and self.writer.exists(path)
+
+    def record(self, path, digest: str):
+        self.new[self._key(path)] = digest
+
+    def keep(self, path, digest: str):
+        """Leave a fresh file untouched, while recording that it is still generated."""
+        self.writer.keep(path)
+        self.record(path, digest)
+
+    def write(self, path, text: str, source_digest: str = None):
+        """Write a file, unless it already has the same content.
+
+        The file is recorded under the digest of its content, unless the digest of whatever it was
+        generated from is provided.
+
+        """
+        self.writer.write(path, text)
+        self.record(path, source_digest or digest(text))
+
+    def stale(self):
+        """Files which were generated by the previous build but not by this one."""
+        return [self.root.joinpath(key) for key in self.old if key not in self.new]
+
+    def save(self):
+        """Delete stale files and store the manifest on disk."""
+        for path in self.stale():
+            if not self.writer.delete(path):
+                continue
+            # Remove the directories which have been left empty
+            for parent in path.parents:
+                if parent == self.root or not parent.is_dir() or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+        self.writer.write(
+            self.root.joinpath(self.filename),
+            json.dumps({"files": self.new}, indent=0, sort_keys=True),
+        )
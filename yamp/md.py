@@ -3,19 +3,19 @@ def line(text):
 
 
 def h1(text):
-    return line(f"# {text}")
+    return f"# {text}\n"
 
 
 def h2(text):
-    return line(f"## {text}")
+    return f"## {text}\n"
 
 
 def h3(text):
-    return line(f"### {text}")
+    return f"### {text}\n"
 
 
 def h4(text):
-    return line(f"#### {text}")
+    return f"#### {text}\n"
 
 
 def link(caption, href):
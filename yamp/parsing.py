@@ -0,0 +1,151 @@
+r"""Parsing of numpydoc docstrings, with a cache.
+
+The sections of each docstring are stored in memory, keyed by a hash of the docstring's text.
+Inherited docstrings are therefore only parsed once, instead of once per subclass. The parsed
+sections can be persisted on disk with `save`, and reloaded in a later run with `load`. The entries
+which have been used most recently are persisted first, and the others are evicted once there are
+`CAPACITY` of them, so that the cache doesn't keep every revision of every docstring.
+
+`ClassDoc` and `FunctionDoc` are drop-in replacements for those of numpydoc.
+
+Examples
+--------
+
+>>> clear()
+>>> doc = "Summary.\n\nParameters\n----------\nx\n    The x.\n"
+>>> FunctionDoc(func=None, doc=doc)["Parameters"]
+[Parameter(name='x', type='', desc=['The x.'])]
+
+>>> FunctionDoc(func=None, doc=doc)["Parameters"]
+[Parameter(name='x', type='', desc=['The x.'])]
+
+>>> len(drain())
+1
+
+"""
+import hashlib
+
+import numpydoc
+from numpydoc import docscrape
+
+from yamp import cache
+from yamp import profiling
+
+CAPACITY = 1 << 15
+
+_parsed = {}
+_new = {}
+# The keys of the entries which have been used since the last save, the most recent last
+_used = {}
+_loaded = set()
+# Whether some entries have been parsed since the last save
+_pending = False
+
+
+def _use(key, parsed=False):
+    global _pending
+    _used.pop(key, None)
+    _used[key] = None
+    _pending = _pending or parsed
+
+
+class _Cached:
+    def _parse(self):
+        key = hashlib.sha1("\n".join(self._doc._str).encode()).hexdigest()
+        if (parsed := _parsed.get(key)) is None:
+            with profiling.profiler.stage("parse"):
+                super()._parse()
+            _parsed[key] = _new[key] = dict(self._parsed_data)
+        else:
+            # ClassDoc fills in some sections afterwards, so the cached dict is copied
+            self._parsed_data = dict(parsed)
+            _new.setdefault(key, None)
+        _use(key, parsed=parsed is None)
+
+
+class ClassDoc(_Cached, docscrape.ClassDoc):
+    pass
+
+
+class FunctionDoc(_Cached, docscrape.FunctionDoc):
+    pass
+
+
+def clear():
+    """Forgets about every docstring which has been parsed so far."""
+    global _pending
+    _parsed.clear()
+    _new.clear()
+    _used.clear()
+    _loaded.clear()
+    _pending = False
+
+
+def drain() -> dict:
+    """Returns the entries which have been parsed since the last call, and forgets about them.
+
+    The keys of the entries which have only been reused map to None.
+
+    """
+    new = dict(_new)
+    _new.clear()
+    return new
+
+
+def update(entries: dict):
+    """Adds entries which have been drained elsewhere, for instance by another process."""
+    for key, sections in entries.items():
+        if sections is not None:
+            _parsed[key] = sections
+        _use(key, parsed=sections is not None)
+
+
+def _encode(value):
+    if isinstance(value, docscrape.Parameter):
+        return {"Parameter": list(value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and "Parameter" in value:
+        return docscrape.Parameter(*value["Parameter"])
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def load(library: str):
+    """Loads the entries stored on disk by a previous run."""
+    if library in _loaded:
+        return
+    _loaded.add(library)
+    entries = cache.load("numpydoc", library, key=numpydoc.__version__) or {}
+    for key, sections in entries.items():
+        _parsed.setdefault(key, {k: _decode(v) for k, v in sections.items()})
+
+
+def save(library: str):
+    """Stores the most recently used entries on disk, if some new ones have been parsed.
+
+    The entries which have only been reused are remembered as such until new ones are parsed,
+    which saves rewriting the cache after each build.
+
+    """
+    global _pending
+    drain()
+    if not _pending:
+        return
+    keys = [*reversed(_used), *(key for key in _parsed if key not in _used)]
+    cache.save(
+        "numpydoc",
+        library,
+        key=numpydoc.__version__,
+        data={
+            key: {k: _encode(v) for k, v in _parsed[key].items()}
+            for key in keys[:CAPACITY]
+        },
+    )
+    _used.clear()
+    _pending = False
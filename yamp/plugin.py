@@ -0,0 +1,156 @@
+"""MkDocs plugin, which generates the API reference while the docs are being built.
+
+The pages of the API reference are generated in memory, and are handed to MkDocs as virtual files,
+instead of being written to the docs directory and read back. The hand-written pages are linkified
+as they are read. The library and the link index stay in memory for the lifetime of `mkdocs serve`,
+along with the generated pages. When the library's source code is edited, only the affected
+modules are reloaded, and only the pages whose object has changed are rendered again. The search
+index of the API reference is written to the site once it is built. The site is then precompressed
+if `compress` lists formats, among gz and br, for static hosts which serve precompressed files.
+
+The plugin is enabled in mkdocs.yml:
+
+    plugins:
+      - search
+      - yamp:
+          library: river
+
+"""
+import importlib.util
+import logging
+import os
+import pathlib
+
+from mkdocs.config import config_options
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.files import File
+from mkdocs.utils import write_file
+
+import yamp
+from yamp import search
+from yamp import watch
+from yamp.writer import COMPRESSORS, MemoryWriter, precompress
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+# The linkifier points to this directory
+API_DIR = "api"
+
+
+class YampPlugin(BasePlugin):
+    config_scheme = (
+        ("library", config_options.Type(str, required=True)),
+        ("static", config_options.Type(bool, default=False)),
+        ("jobs", config_options.Type(int, default=1)),
+        ("use_cache", config_options.Type(bool, default=False)),
+        ("linkify", config_options.Type(bool, default=True)),
+        ("config", config_options.Type(str, default=None)),
+        # The budgets of each object, in seconds and in megabytes, as with --timeout and --memory
+        ("timeout", config_options.Type((int, float), default=None)),
+        ("memory", config_options.Type(int, default=None)),
+        (
+            "compress",
+            config_options.ListOfItems(
+                config_options.Choice(sorted(COMPRESSORS)), default=[]
+            ),
+        ),
+    )
+
+    def __init__(self):
+        self.files = {}
+        self.linkifier = None
+        self.watcher = None
+        self.api_dir = None
+
+    def on_startup(self, command, dirty):
+        # Defining this hook keeps the plugin alive from one build of `mkdocs serve` to the next
+        pass
+
+    def on_files(self, files, config):
+        library, static = self.config["library"], self.config["static"]
+        first = self.watcher is None
+
+        if first:
+            yamp.exclusions.configure(
+                yamp.config.load(self.config["config"]).get("exclude")
+            )
+            self.watcher = watch.Watcher(library, static=static)
+            if self.config["linkify"]:
+                self.linkifier = yamp.Linkifier(
+                    library=library, use_cache=self.config["use_cache"], static=static
+                )
+        elif changes := self.watcher.changes():
+            reloaded = self.watcher.reload(changes)
+            if self.linkifier:
+                self.linkifier.refresh()
+            log.info(f"Reloaded {', '.join(reloaded)}")
+
+        self.api_dir = pathlib.Path(os.path.abspath(config["docs_dir"]), API_DIR)
+        writer = MemoryWriter(self.files)
+        problems = yamp.print_library(
+            library=library,
+            output_dir=self.api_dir,
+            incremental=not first,
+            # Few pages have to be rendered again, which isn't worth starting worker processes
+            jobs=self.config["jobs"] if first else 1,
+            static=static,
+            use_cache=self.config["use_cache"],
+            linkifier=self.linkifier,
+            timeout=self.config["timeout"],
+            memory=self.config["memory"] and self.config["memory"] * 2**20,
+            writer=writer,
+        )
+        for kind, found in problems.items():
+            if found:
+                log.warning(f"The API reference has {len(found)} {kind} problems")
+        log.info(f"API reference: {writer.report()}")
+
+        # The generated pages take precedence over files with the same path in the docs directory
+        prefix = os.path.join(self.api_dir, "")
+        for path in sorted(self.files):
+            if not path.endswith(".md") or not path.startswith(prefix):
+                continue
+            src = os.path.relpath(path, config["docs_dir"])
+            if existing := files.get_file_from_path(src):
+                files.remove(existing)
+            files.append(
+                File(
+                    src,
+                    config["docs_dir"],
+                    config["site_dir"],
+                    config["use_directory_urls"],
+                )
+            )
+        return files
+
+    def _is_generated(self, page) -> bool:
+        return os.path.abspath(page.file.abs_src_path) in self.files
+
+    def on_page_read_source(self, page, config):
+        if self._is_generated(page):
+            return self.files[os.path.abspath(page.file.abs_src_path)]
+        return None
+
+    def on_page_markdown(self, markdown, page, config, files):
+        if self.linkifier is None or self._is_generated(page):
+            return markdown
+        return self.linkifier.linkify(markdown)
+
+    def on_post_build(self, config):
+        # The search index isn't a page, so it's written to the site as it is
+        path = str(self.api_dir.joinpath(search.FILENAME))
+        if (text := self.files.get(path)) is not None:
+            write_file(
+                text.encode("utf-8"),
+                os.path.join(config["site_dir"], API_DIR, search.FILENAME),
+            )
+        if self.config["compress"]:
+            n = precompress(config["site_dir"], self.config["compress"])
+            log.info(f"Precompressed {n} files")
+
+    def on_serve(self, server, config, builder):
+        # Editing the library triggers a rebuild
+        spec = importlib.util.find_spec(self.config["library"])
+        for location in spec.submodule_search_locations or [spec.origin]:
+            server.watch(location)
+        return server
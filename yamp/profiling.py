@@ -0,0 +1,146 @@
+"""Instrumentation of the build's stages.
+
+The profiler is disabled by default, in which case it costs next to nothing. Once enabled, it
+measures the wall time and the number of calls of each stage, as well as the time spent rendering
+each object. Stages can be nested, for instance parsing happens while rendering, so their times
+shouldn't be summed up. The recorded spans can be exported in the trace event format, which can be
+opened with chrome://tracing or https://ui.perfetto.dev.
+
+Examples
+--------
+
+>>> profiler = Profiler()
+>>> profiler.enabled = True
+>>> with profiler.stage("render", name="foo.Bar"):
+...     with profiler.stage("parse"):
+...         pass
+
+>>> report = profiler.report()
+>>> {stage: timing["calls"] for stage, timing in report["stages"].items()}
+{'parse': 1, 'render': 1}
+>>> [obj["name"] for obj in report["slowest_objects"]]
+['foo.Bar']
+>>> [mod["name"] for mod in report["slowest_modules"]]
+['foo']
+
+"""
+import contextlib
+import functools
+import json
+import os
+import time
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.objects = {}
+        self.events = []
+
+    @contextlib.contextmanager
+    def _stage(self, stage: str, name: str = None):
+        tic = time.perf_counter()
+        try:
+            yield
+        finally:
+            toc = time.perf_counter()
+            timing = self.stages.setdefault(stage, [0.0, 0])
+            timing[0] += toc - tic
+            timing[1] += 1
+            if name is not None:
+                self.objects[name] = self.objects.get(name, 0.0) + toc - tic
+            self.events.append(
+                {
+                    "name": name or stage,
+                    "cat": stage,
+                    "ph": "X",
+                    "ts": tic * 1e6,
+                    "dur": (toc - tic) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": 0,
+                }
+            )
+
+    def stage(self, stage: str, name: str = None):
+        """Times a stage of the build. The name of the object being processed may be provided."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._stage(stage, name)
+
+    def drain(self) -> dict:
+        """Returns the measurements made so far, and forgets about them."""
+        state = {"stages": self.stages, "objects": self.objects, "events": self.events}
+        self.stages, self.objects, self.events = {}, {}, []
+        return state
+
+    def merge(self, state: dict):
+        """Adds measurements made elsewhere, for instance by another process."""
+        for stage, (seconds, calls) in state["stages"].items():
+            timing = self.stages.setdefault(stage, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+        for name, seconds in state["objects"].items():
+            self.objects[name] = self.objects.get(name, 0.0) + seconds
+        self.events.extend(state["events"])
+
+    def report(self, top=10) -> dict:
+        """Summarizes the measurements, along with the `top` slowest modules and objects."""
+        modules = {}
+        for name, seconds in self.objects.items():
+            module = name.rpartition(".")[0]
+            modules[module] = modules.get(module, 0.0) + seconds
+        slowest = lambda timings: [
+            {"name": name, "time": seconds}
+            for name, seconds in sorted(timings.items(), key=lambda x: -x[1])[:top]
+        ]
+        return {
+            "total": time.perf_counter() - self.start,
+            "stages": {
+                stage: {"time": seconds, "calls": calls}
+                for stage, (seconds, calls) in sorted(self.stages.items())
+            },
+            "slowest_modules": slowest(modules),
+            "slowest_objects": slowest(self.objects),
+        }
+
+    def save_report(self, path, top=10):
+        with open(path, "w") as file:
+            json.dump(self.report(top=top), file, indent=2)
+
+    def save_trace(self, path):
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events}, file)
+
+
+def summary(report: dict) -> str:
+    """Formats a report in a human-readable way."""
+    lines = [f"Total: {report['total']:.3f}s", "", "Stage           Time (s)     Calls"]
+    for stage, timing in report["stages"].items():
+        lines.append(f"{stage:<15} {timing['time']:>8.3f} {timing['calls']:>9}")
+    for title, key in (("modules", "slowest_modules"), ("objects", "slowest_objects")):
+        if report[key]:
+            lines.extend(["", f"Slowest {title}"])
+            lines.extend(f"{x['time']:>8.3f}s  {x['name']}" for x in report[key])
+    return "\n".join(lines)
+
+
+def timed(stage: str):
+    """Decorator which times each call of a function as a stage of the build."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+profiler = Profiler()
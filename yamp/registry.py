@@ -0,0 +1,117 @@
+"""Bookkeeping of the places where each object is documented.
+
+A library may expose the same object under several modules, for instance when a function is
+re-exported by a sibling module. Such an object is only documented once, at its canonical
+location, while the other locations are aliases which point to it. The canonical location is the
+one whose module is the closest to where the object is defined, which for a module is the module
+itself. Ties are broken in favor of the location which was encountered first.
+
+Examples
+--------
+
+>>> from yamp import utils
+
+>>> registry = Registry("yamp")
+>>> registry.add(utils.snake_to_kebab, "md/snake-to-kebab")
+True
+>>> registry.add(utils.snake_to_kebab, "utils/snake-to-kebab")
+False
+>>> registry.locations(utils.snake_to_kebab)
+['md/snake-to-kebab', 'utils/snake-to-kebab']
+>>> registry.canonical(utils.snake_to_kebab)
+'utils/snake-to-kebab'
+
+The locations of modules are recorded beforehand, so that a submodule which is re-exported by a
+sibling module is walked through at the right place, whichever module comes first.
+
+>>> import types
+
+>>> alpha, beta = types.ModuleType("edge.alpha"), types.ModuleType("edge.beta")
+>>> alpha.sub = beta.sub = types.ModuleType("edge.beta.sub")
+>>> submodules = lambda mod: [("sub", mod.sub)] if hasattr(mod, "sub") else []
+
+>>> registry = Registry("edge")
+>>> registry.add_tree(alpha, "alpha", submodules)
+>>> registry.add_tree(beta, "beta", submodules)
+>>> registry.locations(beta.sub)
+['alpha/sub', 'beta/sub']
+>>> registry.canonical(beta.sub)
+'beta/sub'
+
+"""
+import inspect
+import posixpath
+
+from yamp import utils
+
+
+class Registry:
+    """Keeps track of the locations of objects, which are identified by their id.
+
+    Parameters
+    ----------
+    library
+        The name of the library. Locations are relative to it, with slashes instead of dots.
+
+    """
+
+    def __init__(self, library: str):
+        self.library = library
+        # The objects are stored alongside their locations, so that their ids remain valid
+        self._entries = {}
+
+    def __contains__(self, obj):
+        return id(obj) in self._entries
+
+    def add(self, obj, location: str) -> bool:
+        """Records a location of an object. Returns whether the object was seen for the first
+        time."""
+        if (entry := self._entries.get(id(obj))) is None:
+            self._entries[id(obj)] = (obj, [location])
+            return True
+        if location not in entry[1]:
+            entry[1].append(location)
+        return False
+
+    def add_tree(self, mod, location: str, submodules):
+        """Records the locations of a module and of the modules below it.
+
+        `submodules` returns the (name, module) pairs a module exposes. A module is searched
+        under each one of its locations, but not below itself, which would never end.
+
+        """
+        stack = [(mod, location, ())]
+        while stack:
+            mod, location, ancestors = stack.pop()
+            self.add(mod, location)
+            ancestors = (*ancestors, id(mod))
+            for name, submod in reversed(list(submodules(mod))):
+                if id(submod) not in ancestors:
+                    slug = utils.snake_to_kebab(name)
+                    stack.append((submod, f"{location}/{slug}", ancestors))
+
+    def locations(self, obj) -> list:
+        return self._entries[id(obj)][1]
+
+    def _score(self, obj, location: str) -> int:
+        # Locations may be made of slugs, in which underscores are replaced with dashes
+        module = ".".join(
+            [self.library, *filter(None, posixpath.dirname(location).split("/"))]
+        ).replace("_", "-")
+        defined_in = obj.__name__ if inspect.ismodule(obj) else obj.__module__
+        defined_in = (defined_in or "").replace("_", "-")
+        if defined_in == module or defined_in.startswith(f"{module}."):
+            return len(module)
+        return -1
+
+    def canonical(self, obj) -> str:
+        """The location where an object is documented."""
+        locations = self.locations(obj)
+        if len(locations) == 1:
+            return locations[0]
+        # max returns the first of the best locations
+        return max(locations, key=lambda location: self._score(obj, location))
+
+    def __iter__(self):
+        for obj, _ in self._entries.values():
+            yield obj
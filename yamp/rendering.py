@@ -0,0 +1,478 @@
+"""Rendering of the records of the intermediate representation.
+
+A page is built up from fragments, which are appended to a list and joined once at the end, rather
+than printed to a file line by line. Each section of a page is rendered by a method of a target.
+`Markdown` renders the pages which MkDocs reads, and `HTML` renders fragments which can be embedded
+in any website. Both of them only need the records, see `yamp.ir`. The pages link to each other
+relatively to the page which is being rendered, which is given by its location in the API reference.
+
+Examples
+--------
+
+>>> from yamp import ir
+>>> from yamp.registry import Registry
+
+>>> record = ir.describe(Registry)
+>>> print(MARKDOWN.page(record).splitlines()[0])
+# Registry
+>>> print(HTML().page(record).splitlines()[0])
+<h1>Registry</h1>
+
+>>> MARKDOWN.href("alpha/Model", location="overview")
+'../alpha/Model'
+>>> HTML().href("alpha/Model", location="overview")
+'alpha/Model.html'
+
+"""
+import doctest
+import html
+import inspect
+import posixpath
+import re
+
+from yamp import md
+from yamp import symbols
+
+
+def concat_lines(lines):
+    return inspect.cleandoc(
+        " ".join(
+            # Either empty space or list item
+            f"{line}\n\n" if (line == "") or (line.strip().startswith("-")) else line
+            for line in lines
+        )
+    )
+
+
+def _parse_examples(examples, outputs):
+    """Splits examples into text and doctest examples, with the actual outputs if known."""
+    parts = doctest.DocTestParser().parse(inspect.cleandoc("\n".join(examples)))
+    outputs = iter(outputs or [])
+    for part in parts:
+        if isinstance(part, doctest.Example):
+            if (output := next(outputs, None)) is not None:
+                part.want = output
+            yield part
+        elif part:
+            yield part
+
+
+class Target:
+    """Renders records to a format. The sections of a page are rendered in the order of
+    `SECTIONS`, by the methods of the same name."""
+
+    suffix = None
+    SECTIONS = (
+        "summary",
+        "parameters",
+        "attributes",
+        "examples",
+        "methods",
+        "notes",
+        "references",
+    )
+
+    # The location of the page which is being rendered, if known
+    location = None
+
+    def href(self, path: str, location: str) -> str:
+        """The link to the page at `path` from the page at `location`. Both are relative to the
+        API reference, without a suffix."""
+        raise NotImplementedError
+
+    def page(self, record: dict, location: str = None) -> str:
+        """Returns the page of a class or a function, which is found at `location`."""
+        self.location = location
+        out = []
+        add = out.append
+        self.title(record, add)
+        if record.get("error"):
+            self.error(record, add)
+        else:
+            for section in self.SECTIONS:
+                getattr(self, section)(record, add)
+        return "".join(out)
+
+    def module(self, record: dict, location="overview") -> str:
+        """Returns the section of the overview which is dedicated to a module."""
+        self.location = location
+        out = []
+        self._module(record, out.append, is_submodule=False)
+        return "".join(out)
+
+
+class Markdown(Target):
+    """Renders records to the Markdown which MkDocs reads."""
+
+    suffix = ".md"
+
+    def href(self, path, location):
+        # MkDocs serves each page as a directory, such as alpha/Model/index.html
+        return posixpath.relpath(path, location)
+
+    def title(self, record, add):
+        add(md.h1(record["name"]) + "\n")
+
+    def error(self, record, add):
+        add('!!! failure "Missing documentation"\n')
+        add(
+            f"    The documentation of {md.code(record['module'] + '.' + record['qualname'])} "
+            f"couldn't be generated: {record['error']['message']}\n"
+        )
+
+    def summary(self, record, add):
+        add(md.line(concat_lines(record["summary"])) + "\n")
+        add(md.line(concat_lines(record["extended_summary"])) + "\n")
+
+    def parameters(self, record, add):
+        if record["parameters"]:
+            add(md.h2("Parameters") + "\n")
+        for param in record["parameters"]:
+            add(f"- **{param['name']}**\n\n")
+            if param["annotation"] is not None:
+                add(f"     *Type* → *{param['annotation']}*\n\n")
+            if param["default"] is not None:
+                add(f"     *Default* → `{param['default']}`\n\n")
+            add("\n\n")
+            if desc := param["description"]:
+                add(f"    {desc}\n\n")
+        add("\n")
+
+    def attributes(self, record, add):
+        if record["attributes"]:
+            add(md.h2("Attributes") + "\n")
+        for attr in record["attributes"]:
+            add(f"- **{attr['name']}**")
+            if attr["type"]:
+                add(f" (*{attr['type']}*)")
+            add("\n\n")
+            if desc := attr["description"]:
+                add(f"    {desc}\n\n")
+        add("\n")
+
+    def examples(self, record, add):
+        if record["examples"]:
+            add(md.h2("Examples") + "\n")
+            in_code = False
+            for part in _parse_examples(record["examples"], record.get("outputs")):
+                if isinstance(part, doctest.Example):
+                    # Start code fences for new examples
+                    if not in_code:
+                        add("```python\n")
+                        in_code = True
+                    add(part.source)
+                    if part.want:
+                        # Close the code fences of the source, and enclose the output in its own
+                        add(f"```\n```\n{part.want}```\n")
+                        in_code = False
+                else:
+                    if in_code and part.strip():
+                        add("```\n")
+                        in_code = False
+                    add(part)
+            if in_code:
+                add("```\n")
+        add("\n")
+
+    def methods(self, record, add):
+        if record["methods"] is None:
+            return
+        add(md.h2("Methods") + "\n")
+        for method in record["methods"]:
+            self.method(method, add)
+
+    def method(self, method, add):
+        add(md.line(f'???- abstract "{method["name"]}"') + "\n")
+        if "summary" not in method:
+            return
+
+        add(f"    {md.line(' '.join(method['summary']))}\n")
+        if method["extended_summary"]:
+            add(f"    {md.line(' '.join(method['extended_summary']))}\n")
+
+        # The signature is never empty, but self doesn't count
+        if len(method["parameters"]) > 1:
+            add("    **Parameters**\n\n")
+        for param in method["parameters"]:
+            if param["name"] == "self":
+                continue
+            add(f"    - **{param['name']}**")
+            if param["annotation"] is not None:
+                add(f"     — *{param['annotation']}*")
+            if param["default"] is not None:
+                add(f"     — defaults to `{param['default']}`")
+            add("    \n")
+            if desc := param["description"]:
+                add(f"        {desc}\n")
+        add("    \n")
+
+        if returns := method["returns"]:
+            add("    **Returns**\n\n")
+            if returns["annotation"] is not None:
+                add(f"    *{returns['annotation']}*: ")
+            add(f"    {returns['type']}\n    \n")
+
+        # Add a space between methods
+        add("<span />\n")
+
+    def notes(self, record, add):
+        if record["notes"]:
+            add(md.h2("Notes") + "\n")
+            add(md.line("\n".join(record["notes"])) + "\n")
+
+    def references(self, record, add):
+        if record["references"]:
+            add(md.line("\n".join(record["references"])) + "\n")
+
+    def alias(self, name: str, canonical: str, location: str) -> str:
+        href = self.href(canonical, location)
+        where = md.code(posixpath.dirname(canonical))
+        return (
+            md.h1(name)
+            + "\n"
+            + md.line(
+                f"Alias of {md.link(name, href)}, which is documented in {where}."
+            )
+            + "\n"
+        )
+
+    def _module(self, record, add, is_submodule):
+        heading = md.h3 if is_submodule else md.h2
+        add(heading(record["name"]) + "\n")
+        if record["doc"]:
+            add(md.line(record["doc"]) + "\n")
+
+        # Some modules provide their own overview
+        if record["overview"] is not None:
+            add(record["overview"])
+        else:
+            classes, funcs = record["classes"], record["functions"]
+            if classes and funcs:
+                add("\n**Classes**\n\n")
+            for name, slug in classes:
+                href = self.href(f"{record['path']}/{slug}", self.location)
+                add(md.li(md.link(name, href)))
+            if classes and funcs:
+                add("\n**Functions**\n\n")
+            for name, slug in funcs:
+                href = self.href(f"{record['path']}/{slug}", self.location)
+                add(md.li(md.link(name, href)))
+
+        for submodule in record["submodules"]:
+            if "alias" in submodule:
+                add(md.h3(submodule["name"]) + "\n")
+                add(md.line(f"Alias of {md.code(submodule['alias'])}.") + "\n")
+                continue
+            self._module(submodule, add, is_submodule=True)
+
+        add("\n")
+
+
+MARKDOWN = Markdown()
+
+
+class HTML(Target):
+    """Renders records to HTML fragments.
+
+    The text of the docstrings is escaped, apart from inline code. The objects of the link index
+    which are mentioned, be it in inline code or in the text, are linked to their page, as
+    `yamp.Linkifier` does for Markdown.
+
+    Parameters
+    ----------
+    table
+        The link index, as a `yamp.symbols.SymbolTable`.
+    pages
+        The locations of the pages which are rendered. If provided, the objects which don't have
+        a page, such as modules or imported names, aren't linked.
+
+    """
+
+    suffix = ".html"
+    # Either inline code or a dotted name, as matched by yamp.Linkifier
+    MENTION = re.compile(r"`([^`\n]+)`|(?:\w+\.)+\w+")
+
+    def __init__(self, table: symbols.SymbolTable = None, pages=None):
+        self.table = table
+        self.pages = pages
+
+    def href(self, path, location):
+        return posixpath.relpath(path, posixpath.dirname(location) or ".") + self.suffix
+
+    def _link(self, text, code=False) -> str:
+        """Links an escaped piece of text to the page of the object it names, if any."""
+        symbol = self.table and self.table.resolve(html.unescape(text))
+        if symbol and self.pages is not None and symbol.path not in self.pages:
+            symbol = None
+        if symbol and not symbol.path:
+            symbol = None
+        if symbol and symbol.display is not None:
+            text = html.escape(symbol.display, quote=False)
+        if code:
+            text = f"<code>{text}</code>"
+        if symbol:
+            if self.location is None:
+                href = f"/api/{symbol.path}{self.suffix}"
+            else:
+                href = self.href(symbol.path, self.location)
+            return f'<a href="{html.escape(href)}">{text}</a>'
+        return text
+
+    def _mention(self, match):
+        if (code := match.group(1)) is not None:
+            return self._link(code, code=True)
+        return self._link(match.group())
+
+    def _text(self, text) -> str:
+        return self.MENTION.sub(self._mention, html.escape(text, quote=False))
+
+    def _paragraphs(self, text, add):
+        for paragraph in re.split(r"\n\s*\n", text):
+            if paragraph.strip():
+                add(f"<p>{self._text(paragraph.strip())}</p>\n")
+
+    def title(self, record, add):
+        add(f"<h1>{html.escape(record['name'])}</h1>\n")
+
+    def error(self, record, add):
+        name = html.escape(f"{record['module']}.{record['qualname']}")
+        add('<div class="admonition failure">\n')
+        add('<p class="admonition-title">Missing documentation</p>\n')
+        add(
+            f"<p>The documentation of <code>{name}</code> couldn't be generated: "
+            f"{html.escape(record['error']['message'])}</p>\n"
+        )
+        add("</div>\n")
+
+    def summary(self, record, add):
+        self._paragraphs(concat_lines(record["summary"]), add)
+        self._paragraphs(concat_lines(record["extended_summary"]), add)
+
+    def _parameter(self, param, add):
+        add(f"<dt><strong>{html.escape(param['name'])}</strong>")
+        if param["annotation"] is not None:
+            add(f" — <em>{self._text(param['annotation'])}</em>")
+        if param["default"] is not None:
+            default = html.escape(param["default"], quote=False)
+            add(f" — defaults to {self._link(default, code=True)}")
+        add("</dt>\n")
+        if desc := param["description"]:
+            add(f"<dd>{self._text(desc)}</dd>\n")
+
+    def parameters(self, record, add):
+        if not record["parameters"]:
+            return
+        add("<h2>Parameters</h2>\n<dl>\n")
+        for param in record["parameters"]:
+            self._parameter(param, add)
+        add("</dl>\n")
+
+    def attributes(self, record, add):
+        if not record["attributes"]:
+            return
+        add("<h2>Attributes</h2>\n<dl>\n")
+        for attr in record["attributes"]:
+            add(f"<dt><strong>{html.escape(attr['name'])}</strong>")
+            if attr["type"]:
+                add(f" (<em>{self._text(attr['type'])}</em>)")
+            add("</dt>\n")
+            if desc := attr["description"]:
+                add(f"<dd>{self._text(desc)}</dd>\n")
+        add("</dl>\n")
+
+    def examples(self, record, add):
+        if not record["examples"]:
+            return
+        add("<h2>Examples</h2>\n")
+        in_code = False
+        for part in _parse_examples(record["examples"], record.get("outputs")):
+            if isinstance(part, doctest.Example):
+                if not in_code:
+                    add('<pre><code class="language-python">')
+                    in_code = True
+                add(html.escape(part.source))
+                if part.want:
+                    add("</code></pre>\n")
+                    add(f"<pre><code>{html.escape(part.want)}</code></pre>\n")
+                    in_code = False
+            elif part.strip():
+                if in_code:
+                    add("</code></pre>\n")
+                    in_code = False
+                self._paragraphs(part, add)
+        if in_code:
+            add("</code></pre>\n")
+
+    def methods(self, record, add):
+        if record["methods"] is None:
+            return
+        add("<h2>Methods</h2>\n")
+        for method in record["methods"]:
+            name = html.escape(method["name"])
+            add(f'<details class="abstract">\n<summary>{name}</summary>\n')
+            if "summary" in method:
+                self._paragraphs(" ".join(method["summary"]), add)
+                self._paragraphs(" ".join(method["extended_summary"]), add)
+                parameters = [p for p in method["parameters"] if p["name"] != "self"]
+                if parameters:
+                    add("<p><strong>Parameters</strong></p>\n<dl>\n")
+                    for param in parameters:
+                        self._parameter(param, add)
+                    add("</dl>\n")
+                if returns := method["returns"]:
+                    add("<p><strong>Returns</strong></p>\n<p>")
+                    if returns["annotation"] is not None:
+                        add(f"<em>{self._text(returns['annotation'])}</em>: ")
+                    add(f"{self._text(returns['type'])}</p>\n")
+            add("</details>\n")
+
+    def notes(self, record, add):
+        if record["notes"]:
+            add("<h2>Notes</h2>\n")
+            self._paragraphs("\n".join(record["notes"]), add)
+
+    def references(self, record, add):
+        if record["references"]:
+            self._paragraphs("\n".join(record["references"]), add)
+
+    def alias(self, name: str, canonical: str, location: str) -> str:
+        href = self.href(canonical, location)
+        where = posixpath.dirname(canonical)
+        return (
+            f"<h1>{html.escape(name)}</h1>\n"
+            f'<p>Alias of <a href="{html.escape(href)}">{html.escape(name)}</a>, which is '
+            f"documented in <code>{html.escape(where)}</code>.</p>\n"
+        )
+
+    def _module(self, record, add, is_submodule):
+        tag = "h3" if is_submodule else "h2"
+        add(f"<{tag}>{html.escape(record['name'])}</{tag}>\n")
+        if record["doc"]:
+            self._paragraphs(record["doc"], add)
+
+        if record["overview"] is not None:
+            self._paragraphs(record["overview"], add)
+        else:
+            for title, members in (
+                ("Classes", record["classes"]),
+                ("Functions", record["functions"]),
+            ):
+                if not members:
+                    continue
+                if record["classes"] and record["functions"]:
+                    add(f"<p><strong>{title}</strong></p>\n")
+                add("<ul>\n")
+                for name, slug in members:
+                    href = html.escape(
+                        self.href(f"{record['path']}/{slug}", self.location)
+                    )
+                    add(f'<li><a href="{href}">{html.escape(name)}</a></li>\n')
+                add("</ul>\n")
+
+        for submodule in record["submodules"]:
+            if "alias" in submodule:
+                add(f"<h3>{html.escape(submodule['name'])}</h3>\n")
+                alias = html.escape(submodule["alias"])
+                add(f"<p>Alias of <code>{alias}</code>.</p>\n")
+                continue
+            self._module(submodule, add, is_submodule=True)
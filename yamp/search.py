@@ -0,0 +1,143 @@
+"""Search index of the API reference.
+
+The search plugin of MkDocs indexes the text of each page, which for the API reference means
+tokenizing every generated page at build time, and having the browser download all of that text.
+Yet the API reference is searched by names, which are known before the pages are even rendered.
+The search index therefore holds a document per module, class, and function, which is made of its
+name, its qualified path, its summary, and the names of its parameters. The documents are taken
+from the records the pages are rendered from.
+
+Each field has a weight, and a document scores the weights of the fields where the terms of a
+query are found. The index is stored as JSON, with the fields listed once, followed by a row per
+document, and the locations of the pages are relative to the API reference.
+
+Examples
+--------
+
+>>> module = {
+...     "name": "animals",
+...     "path": "animals",
+...     "doc": "Animals live here.\\n\\nAnd nowhere else.",
+...     "classes": [["Dog", "Dog"]],
+...     "functions": [],
+...     "submodules": [],
+... }
+>>> record = {
+...     "summary": ["A dog."],
+...     "parameters": [{"name": "name"}, {"name": "breed"}],
+... }
+>>> rows = documents("zoo", [module], {"animals/Dog": fields(record)})
+>>> for row in rows:
+...     print(row)
+['animals', 'module', 'animals', 'zoo.animals', 'Animals live here.', []]
+['animals/Dog', 'class', 'Dog', 'zoo.animals.Dog', 'A dog.', ['name', 'breed']]
+
+>>> index = load(dump(rows, library="zoo"))
+>>> search(index, "dog breed")
+['animals/Dog']
+>>> search(index, "animals")
+['animals', 'animals/Dog']
+
+"""
+import inspect
+import json
+
+FILENAME = "search.json"
+FIELDS = ["location", "kind", "name", "path", "summary", "parameters"]
+WEIGHTS = {"name": 10, "path": 5, "summary": 2, "parameters": 1}
+
+
+def _summary(doc) -> str:
+    if not doc:
+        return ""
+    return " ".join(inspect.cleandoc(doc).split("\n\n")[0].split())
+
+
+def fields(record: dict) -> list:
+    """The summary and the names of the parameters of a class or a function, from its record."""
+    return [
+        " ".join(record.get("summary") or []),
+        [param["name"] for param in record.get("parameters") or []],
+    ]
+
+
+def documents(library: str, modules: list, entries: dict) -> list:
+    """Lists the documents of the modules, and of the classes and functions of `entries`.
+
+    The modules are given by their records, and `entries` maps the location of a page to the
+    `fields` of its object. The classes and functions which don't have an entry, such as those which
+    are documented at another location, are left out.
+
+    """
+    rows = []
+
+    def walk(module, path):
+        path = f"{path}.{module['name']}"
+        summary = _summary(module["doc"])
+        rows.append([module["path"], "module", module["name"], path, summary, []])
+        for kind, members in (
+            ("class", module["classes"]),
+            ("function", module["functions"]),
+        ):
+            for name, slug in members:
+                location = f"{module['path']}/{slug}"
+                if (entry := entries.get(location)) is not None:
+                    rows.append([location, kind, name, f"{path}.{name}", *entry])
+        for submodule in module["submodules"]:
+            if "alias" not in submodule:
+                walk(submodule, path)
+
+    for module in modules:
+        walk(module, library)
+    return rows
+
+
+def dump(rows: list, library: str, version=None) -> str:
+    """Serializes the documents, along with the fields and their weights."""
+    index = {
+        "library": library,
+        "version": version,
+        "fields": FIELDS,
+        "weights": WEIGHTS,
+        "documents": rows,
+    }
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+
+
+def load(text: str) -> dict:
+    """Deserializes an index, and checks that its documents are laid out as expected."""
+    index = json.loads(text)
+    if index.get("fields") != FIELDS:
+        raise ValueError(f"Expected the fields {FIELDS}, found {index.get('fields')}")
+    return index
+
+
+def search(index: dict, query: str, limit=10) -> list:
+    """Returns the locations of the documents which best match a query.
+
+    This is the reference for the way clients are expected to search the index. Each term of the
+    query scores the weights of the fields which contain it, and a document has to contain every
+    term. The documents are ranked by score, and then by order of appearance.
+
+    """
+    terms = query.lower().split()
+    weights = [
+        (FIELDS.index(field), weight) for field, weight in index["weights"].items()
+    ]
+    scores = []
+    for i, row in enumerate(index["documents"]):
+        values = [
+            (" ".join(value) if isinstance(value, list) else value).lower()
+            for value in row
+        ]
+        score = 0
+        for term in terms:
+            found = sum(
+                weight for position, weight in weights if term in values[position]
+            )
+            if not found:
+                break
+            score += found
+        else:
+            scores.append((-score, i, row[0]))
+    return [location for _, _, location in sorted(scores)[:limit]]
@@ -0,0 +1,80 @@
+"""Splitting a build across several machines.
+
+Each shard traverses the whole library, which is cheap, but only renders the pages of the top-level
+modules which are assigned to it. The assignment is deterministic, so that every shard agrees on
+it without having to communicate. Next to its pages, a shard saves a fragment, which holds its
+sections of the overview and its share of the link index. The fragments are assembled by
+`yamp merge`.
+
+"""
+import json
+import pathlib
+
+FILENAME = ".yamp-shard.json"
+
+
+def parse(spec: str):
+    """Parses a shard specification, such as 2/4, into a zero-based index and a count.
+
+    Examples
+    --------
+
+    >>> parse("2/4")
+    (1, 4)
+
+    >>> parse("5/4")
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid shard '5/4', expected i/N with 1 <= i <= N
+
+    """
+    try:
+        i, n = map(int, spec.split("/"))
+    except ValueError:
+        i = n = 0
+    if not 1 <= i <= n:
+        raise ValueError(f"Invalid shard '{spec}', expected i/N with 1 <= i <= N")
+    return i - 1, n
+
+
+def assign(weights: dict, n: int) -> dict:
+    """Assigns each module to one of `n` shards, so that the shards have similar total weights.
+
+    The heaviest modules are assigned first, each one to the lightest shard so far.
+
+    Examples
+    --------
+
+    >>> assign({"a": 5, "b": 3, "c": 2, "d": 1}, n=2)
+    {'a': 0, 'b': 1, 'c': 1, 'd': 0}
+
+    """
+    loads = [0] * n
+    assignment = {}
+    for name, weight in sorted(weights.items(), key=lambda x: (-x[1], x[0])):
+        shard = min(range(n), key=lambda i: (loads[i], i))
+        assignment[name] = shard
+        loads[shard] += weight
+    return {name: assignment[name] for name in weights}
+
+
+def split_index(path_index: dict, rename_index: dict, owners: dict, shard: int):
+    """The part of the link index which belongs to a shard.
+
+    An entry belongs to the shard which owns the top-level directory it points to. The entries
+    which point elsewhere belong to the first shard.
+
+    """
+    owner = lambda key: owners.get(path_index.get(key, "").split("/")[0], 0)
+    return (
+        {k: v for k, v in path_index.items() if owner(k) == shard},
+        {k: v for k, v in rename_index.items() if owner(k) == shard},
+    )
+
+
+def load(directory) -> dict:
+    path = pathlib.Path(directory).joinpath(FILENAME)
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{directory} is not the output of a shard") from None
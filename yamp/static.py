@@ -0,0 +1,696 @@
+"""Builds the documented objects by parsing a library's source code, instead of importing it.
+
+Each module of the library is parsed with the `ast` module. The resulting modules, classes, and
+functions are genuine Python objects, but they are hollow: functions do nothing, and only carry a
+name, a docstring, and a signature. The rest of yamp can therefore handle them exactly as if they
+had been imported. In particular, classes have a genuine MRO, which means docstrings and
+annotations are inherited in the same way.
+
+Modules which aren't written in Python, such as Cython extensions, are imported as a fallback.
+The same goes for the `_docs_overview` function of a module, which is called at runtime. Modules
+from the standard library are imported as usual, while those from other libraries are ignored.
+Still, each module keeps track of the other libraries it needs which aren't installed. A `try`
+statement which catches `ImportError` runs its handlers instead of its body when the latter needs
+such a library, as importing the module would.
+
+An `if` statement whose condition can be decided without running any code, such as a flag set
+by such a `try` statement or a check of `sys.version_info`, only runs the branch it would take.
+Otherwise, both branches are run. This is where static mode may differ from import mode, along
+with bases which come from other libraries: they are left out, so that the classes which inherit
+from them lack the members they would inherit, and escape the exclusion rules which match them.
+
+Examples
+--------
+
+>>> mod = import_module("yamp.utils")
+>>> mod is import_module("yamp.utils")
+True
+
+>>> mod.find_method_signature.__doc__.splitlines()[0]
+"Look through a class' ancestors and fill out the methods signature."
+
+>>> import inspect
+>>> inspect.signature(mod.find_method_signature)
+<Signature (klass, method: str) -> Optional[inspect.Signature]>
+
+"""
+import ast
+import builtins
+import importlib
+import importlib.machinery
+import importlib.util
+import inspect
+import operator
+import pathlib
+import re
+import sys
+import sysconfig
+import types
+
+# Functions which are called at runtime when generating the docs
+RUNTIME_FUNCTIONS = {"_docs_overview"}
+
+_modules = {}
+_missing = {}
+_roots = set()
+
+
+class Expression(str):
+    """A piece of source code which hasn't been evaluated, such as a type annotation."""
+
+    def __repr__(self):
+        return str(self)
+
+
+def clear():
+    """Forgets about every module which has been built so far."""
+    _modules.clear()
+    _missing.clear()
+    _roots.clear()
+
+
+def import_module(name: str, fallback=True):
+    """Counterpart of `importlib.import_module`, which parses the source instead of running it.
+
+    Parameters
+    ----------
+    name
+        The dotted name of the module.
+    fallback
+        Whether to import the modules which are not written in Python, such as extensions.
+
+    """
+    _roots.add(name.split(".")[0])
+    mod = _load(name, fallback=fallback)
+    if mod is None:
+        raise ModuleNotFoundError(f"No module named '{name}'")
+    return mod
+
+
+def reload(names, fallback=True):
+    """Rebuilds some modules from their source code, for instance after it has been edited.
+
+    The modules which refer to the rebuilt ones should be rebuilt as well, and listed after them.
+
+    """
+    for name in names:
+        _modules.pop(name, None)
+    for name in names:
+        _load(name, fallback=fallback)
+
+    # A rebuilt package only has the submodules that it imports itself
+    for name, mod in list(_modules.items()):
+        parent, _, attr = name.rpartition(".")
+        if parent in _modules and not hasattr(_modules[parent], attr):
+            setattr(_modules[parent], attr, mod)
+
+
+def _locate(name: str):
+    """Finds the source of a module without importing it, not even its parent packages."""
+    top, *parts = name.split(".")
+    spec = importlib.util.find_spec(top)
+    if spec is None:
+        return None, None
+    origin, locations = spec.origin, spec.submodule_search_locations
+    for part in parts:
+        # The submodules of an extension module are part of the extension
+        if not locations and origin and not origin.endswith(".py"):
+            break
+        for location in locations or []:
+            location = pathlib.Path(location)
+            if location.joinpath(part, "__init__.py").exists():
+                origin = str(location.joinpath(part, "__init__.py"))
+                locations = [str(location.joinpath(part))]
+                break
+            candidates = [
+                location.joinpath(part + suffix)
+                for suffix in importlib.machinery.all_suffixes()
+            ]
+            if found := next((c for c in candidates if c.exists()), None):
+                origin, locations = str(found), None
+                break
+        else:
+            return None, None
+    return origin, locations
+
+
+def _is_stdlib(name: str) -> bool:
+    if hasattr(sys, "stdlib_module_names"):
+        return name in sys.stdlib_module_names
+    if name in sys.builtin_module_names:
+        return True
+    spec = importlib.util.find_spec(name)
+    return bool(
+        spec
+        and spec.origin
+        and spec.origin.startswith(sysconfig.get_paths()["stdlib"])
+        and "site-packages" not in spec.origin
+    )
+
+
+def _catches_import_error(handler) -> bool:
+    if handler.type is None:
+        return True
+    caught = (
+        handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    )
+    return any(
+        getattr(t, "id", getattr(t, "attr", None))
+        in {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+        for t in caught
+    )
+
+
+def _load(name: str, fallback=True):
+    if name in _modules:
+        return _modules[name]
+    top = name.split(".")[0]
+    if _is_stdlib(top):
+        # The standard library is cheap to import, and provides base classes such as abc.ABC
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            return None
+    if top not in _roots:
+        return None
+
+    # Parent packages are built first, as they would be imported first. They might import the
+    # module themselves in the process.
+    parent, _, attr = name.rpartition(".")
+    parent_mod = _load(parent, fallback=fallback) if parent else None
+    if name in _modules:
+        return _modules[name]
+
+    origin, locations = _locate(name)
+    if origin is None:
+        return None
+    if not origin.endswith(".py"):
+        if not fallback:
+            return None
+        _modules[name] = importlib.import_module(name)
+        return _modules[name]
+
+    mod = types.ModuleType(name)
+    mod.__file__ = origin
+    mod.__package__ = name if locations else name.rpartition(".")[0]
+    if locations:
+        mod.__path__ = list(locations)
+
+    # The module is registered before being built, so that circular imports terminate
+    _modules[name] = mod
+
+    # Importing a submodule binds it to its parent package
+    if parent_mod is not None:
+        setattr(parent_mod, attr, mod)
+
+    source = pathlib.Path(origin).read_text(encoding="utf-8")
+    tree = ast.parse(source, filename=origin)
+    mod.__doc__ = ast.get_docstring(tree, clean=False)
+    builder = _Builder(mod, source, fallback=fallback)
+    _missing[name] = builder.missing
+    builder.run(tree.body)
+    return mod
+
+
+def _resolve(node, namespace):
+    """Evaluates a name, an attribute, or a subscript, without running any code."""
+    if isinstance(node, ast.Name):
+        return namespace.get(node.id)
+    if isinstance(node, ast.Attribute):
+        return getattr(_resolve(node.value, namespace), node.attr, None)
+    if isinstance(node, ast.Subscript):
+        # Generic[T] and the likes
+        return _resolve(node.value, namespace)
+    return None
+
+
+def _evaluate_names(node, namespace):
+    """Evaluates the value of an __all__ list."""
+    try:
+        return list(ast.literal_eval(node))
+    except ValueError:
+        pass
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _evaluate_names(node.left, namespace) + _evaluate_names(
+            node.right, namespace
+        )
+    if isinstance(value := _resolve(node, namespace), (list, tuple)):
+        return list(value)
+    return []
+
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+# The values which a condition may be made of, without running any code
+_DECIDABLE = (bool, int, float, str, tuple, type(None))
+
+def _fold(node):
+    """Evaluates literals, as well as arithmetic on literals such as `1 / 3`.
+
+    >>> _fold(ast.parse("2 ** 0.5 - 1", mode="eval").body)
+    0.41421356237309515
+
+    """
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        try:
+            return _OPERATORS[type(node.op)](_fold(node.left), _fold(node.right))
+        except (ArithmeticError, TypeError) as e:
+            raise ValueError(e)
+    return ast.literal_eval(node)
+
+
+class _Builder:
+    """Runs the top-level statements of a module, or the body of a class."""
+
+    def __init__(self, mod, source, fallback, qualname="", outer=None):
+        self.mod = mod
+        self.source = source
+        self.fallback = fallback
+        self.qualname = qualname
+        self.namespace = {} if qualname else vars(mod)
+        self.outer = outer if outer is not None else vars(mod)
+        self.postponed = False
+        # The libraries which are needed to run the module, but which aren't installed
+        self.missing = set()
+        # The names which are bound by an if statement whose condition couldn't be decided
+        self.uncertain = set()
+
+    def unparse(self, node) -> str:
+        if hasattr(ast, "unparse"):
+            return ast.unparse(node)
+        return ast.get_source_segment(self.source, node)
+
+    def lookup(self, node):
+        return _resolve(node, {**vars(builtins), **self.outer, **self.namespace})
+
+    def run(self, statements):
+        for stmt in statements:
+            method = getattr(self, f"visit_{type(stmt).__name__}", None)
+            if method:
+                method(stmt)
+        return self.namespace
+
+    # Control flow is followed as far as it can be decided, else both branches of an if statement
+    # are run, except for imports guarded by TYPE_CHECKING, which would introduce circular imports
+
+    def _value(self, node):
+        try:
+            return _fold(node)
+        except (ValueError, TypeError, SyntaxError):
+            pass
+        # A name which isn't bound, or which is bound by a branch which may not be taken, is unknown
+        if isinstance(node, ast.Name) and node.id not in self.uncertain:
+            scope = {**vars(builtins), **self.outer, **self.namespace}
+            if node.id in scope and isinstance(scope[node.id], _DECIDABLE):
+                return scope[node.id]
+        if isinstance(node, ast.Attribute):
+            owner = self.lookup(node.value)
+            if owner is not None and isinstance(
+                value := getattr(owner, node.attr, ValueError), _DECIDABLE
+            ):
+                return value
+        raise ValueError(f"Can't evaluate {self.unparse(node)}")
+
+    def decide(self, test):
+        """Evaluates a condition, or raises a ValueError if it depends on running some code."""
+        if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+            return not self.decide(test.operand)
+        if isinstance(test, ast.BoolOp):
+            values = [self.decide(value) for value in test.values]
+            return all(values) if isinstance(test.op, ast.And) else any(values)
+        if isinstance(test, ast.Compare) and all(
+            type(op) in _COMPARISONS for op in test.ops
+        ):
+            left = self._value(test.left)
+            for op, comparator in zip(test.ops, test.comparators):
+                right = self._value(comparator)
+                try:
+                    if not _COMPARISONS[type(op)](left, right):
+                        return False
+                except TypeError as e:
+                    raise ValueError(e)
+                left = right
+            return True
+        return bool(self._value(test))
+
+    def visit_If(self, node):
+        try:
+            branch = node.body if self.decide(node.test) else node.orelse
+        except ValueError:
+            pass
+        else:
+            self.run(branch)
+            return
+        test = node.test
+        if getattr(test, "id", getattr(test, "attr", None)) != "TYPE_CHECKING":
+            self.run(node.body)
+        self.run(node.orelse)
+        self.uncertain.update(
+            name.id
+            for stmt in node.body + node.orelse
+            for name in ast.walk(stmt)
+            if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store)
+        )
+
+    def visit_Try(self, node):
+        if not any(_catches_import_error(handler) for handler in node.handlers):
+            self.run(node.body)
+            self.run(node.orelse)
+            self.run(node.finalbody)
+            return
+
+        # The body is run aside, and is discarded if it needs a library which isn't installed
+        namespace, missing = dict(self.namespace), self.missing
+        self.missing = set()
+        self.run(node.body)
+        failed, self.missing = self.missing, missing
+        if failed:
+            self.namespace.clear()
+            self.namespace.update(namespace)
+            for handler in node.handlers:
+                self.run(handler.body)
+        else:
+            self.run(node.orelse)
+        self.run(node.finalbody)
+
+    def visit_With(self, node):
+        self.run(node.body)
+
+    # Imports
+
+    def _package(self, level):
+        package = self.mod.__package__
+        for _ in range(level - 1):
+            package = package.rpartition(".")[0]
+        return package
+
+    def require(self, name):
+        """Notes down the libraries which are needed to import a module, but aren't installed."""
+        top = name.split(".")[0]
+        if top in _roots:
+            self.missing.update(_missing.get(name, ()))
+        elif not _is_stdlib(top) and importlib.util.find_spec(top) is None:
+            self.missing.add(top)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            mod = _load(alias.name, fallback=self.fallback)
+            self.require(alias.name)
+            if mod is None:
+                continue
+            if alias.asname:
+                self.namespace[alias.asname] = mod
+            else:
+                top = alias.name.split(".")[0]
+                self.namespace[top] = _load(top, fallback=self.fallback)
+
+    def visit_ImportFrom(self, node):
+        # With postponed evaluation, annotations are left as strings at runtime
+        if node.module == "__future__":
+            if any(alias.name == "annotations" for alias in node.names):
+                self.postponed = True
+            return
+
+        name = node.module or ""
+        if node.level:
+            package = self._package(node.level)
+            name = f"{package}.{name}" if name else package
+        mod = _load(name, fallback=self.fallback)
+        self.require(name)
+        if mod is None:
+            return
+
+        for alias in node.names:
+            if alias.name == "*":
+                names = getattr(mod, "__all__", None) or [
+                    n for n in vars(mod) if not n.startswith("_")
+                ]
+                for n in names:
+                    if hasattr(mod, n):
+                        self.namespace[n] = getattr(mod, n)
+                continue
+            obj = getattr(mod, alias.name, None)
+            if obj is None:
+                obj = _load(f"{name}.{alias.name}", fallback=self.fallback)
+            if inspect.ismodule(obj):
+                self.require(obj.__name__)
+            if obj is not None:
+                self.namespace[alias.asname or alias.name] = obj
+
+    # Assignments
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if not isinstance(target, ast.Name):
+                continue
+            if target.id == "__all__":
+                self.namespace["__all__"] = _evaluate_names(node.value, self.namespace)
+            elif isinstance(node.value, ast.Constant):
+                self.namespace[target.id] = node.value.value
+            elif (value := self.lookup(node.value)) is not None:
+                self.namespace[target.id] = value
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name) and node.target.id == "__all__":
+            self.namespace.setdefault("__all__", [])
+            self.namespace["__all__"] += _evaluate_names(node.value, self.namespace)
+
+    def visit_Expr(self, node):
+        # __all__.extend(...) and __all__.append(...)
+        call = node.value
+        if (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Attribute)
+            and isinstance(call.func.value, ast.Name)
+            and call.func.value.id == "__all__"
+            and call.args
+        ):
+            names = self.namespace.setdefault("__all__", [])
+            if call.func.attr == "extend":
+                names.extend(_evaluate_names(call.args[0], self.namespace))
+            elif call.func.attr == "append" and isinstance(call.args[0], ast.Constant):
+                names.append(call.args[0].value)
+
+    # Definitions
+
+    def _annotation(self, node):
+        if node is None:
+            return inspect.Parameter.empty
+        if self.postponed:
+            return self.unparse(node)
+        # A forward reference stays a string at runtime
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            if inspect.isclass(value := self.lookup(node)):
+                return value
+        # inspect.formatannotation drops the prefix of the objects of the typing module
+        return Expression(re.sub(r"\btyping\.", "", self.unparse(node)))
+
+    def _default(self, node):
+        try:
+            return _fold(node)
+        except ValueError:
+            pass
+        if (value := self.lookup(node)) is not None:
+            return value
+        return Expression(self.unparse(node))
+
+    def signature(self, args: ast.arguments, returns=None) -> inspect.Signature:
+        P = inspect.Parameter
+        params = []
+
+        positional = [(a, P.POSITIONAL_ONLY) for a in args.posonlyargs] + [
+            (a, P.POSITIONAL_OR_KEYWORD) for a in args.args
+        ]
+        defaults = [None] * (len(positional) - len(args.defaults)) + args.defaults
+        for (arg, kind), default in zip(positional, defaults):
+            params.append(
+                P(
+                    arg.arg,
+                    kind,
+                    default=P.empty if default is None else self._default(default),
+                    annotation=self._annotation(arg.annotation),
+                )
+            )
+        if args.vararg:
+            params.append(
+                P(
+                    args.vararg.arg,
+                    P.VAR_POSITIONAL,
+                    annotation=self._annotation(args.vararg.annotation),
+                )
+            )
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+            params.append(
+                P(
+                    arg.arg,
+                    P.KEYWORD_ONLY,
+                    default=P.empty if default is None else self._default(default),
+                    annotation=self._annotation(arg.annotation),
+                )
+            )
+        if args.kwarg:
+            params.append(
+                P(
+                    args.kwarg.arg,
+                    P.VAR_KEYWORD,
+                    annotation=self._annotation(args.kwarg.annotation),
+                )
+            )
+
+        return inspect.Signature(
+            params,
+            return_annotation=self._annotation(returns)
+            if returns is not None
+            else inspect.Signature.empty,
+        )
+
+    def _function(self, name, doc, signature):
+        qualname = f"{self.qualname}.{name}" if self.qualname else name
+
+        if name in RUNTIME_FUNCTIONS and not self.qualname:
+            module = self.mod.__name__
+
+            def function(*args, **kwargs):
+                return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+        else:
+
+            def function(*args, **kwargs):
+                pass
+
+        function.__name__ = name
+        function.__qualname__ = qualname
+        function.__module__ = self.mod.__name__
+        function.__doc__ = doc
+        function.__signature__ = signature
+        return function
+
+    def visit_FunctionDef(self, node):
+        function = self._function(
+            node.name,
+            ast.get_docstring(node, clean=False),
+            self.signature(node.args, node.returns),
+        )
+        decorators = {
+            d.id if isinstance(d, ast.Name) else getattr(d, "attr", None)
+            for d in node.decorator_list
+        }
+        if "property" in decorators or "cached_property" in decorators:
+            function = property(function, doc=function.__doc__)
+        elif "staticmethod" in decorators:
+            function = staticmethod(function)
+        elif "classmethod" in decorators:
+            function = classmethod(function)
+        elif self.qualname and any(
+            isinstance(d, ast.Attribute) and d.attr in ("setter", "deleter")
+            for d in node.decorator_list
+        ):
+            # The property was already defined by its getter
+            return
+        self.namespace[node.name] = function
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _dataclass_init(self, node):
+        """Synthesizes the __init__ method of a dataclass from its fields."""
+        args = ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg("self")],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        )
+        for stmt in node.body:
+            if not isinstance(stmt, ast.AnnAssign) or not isinstance(
+                stmt.target, ast.Name
+            ):
+                continue
+            if "ClassVar" in self.unparse(stmt.annotation):
+                continue
+            args.args.append(ast.arg(stmt.target.id, stmt.annotation))
+            if stmt.value is not None:
+                args.defaults.append(stmt.value)
+        return self._function("__init__", None, self.signature(args))
+
+    def visit_ClassDef(self, node):
+        qualname = f"{self.qualname}.{node.name}" if self.qualname else node.name
+
+        bases = []
+        for base in node.bases:
+            if inspect.isclass(value := self.lookup(base)) and value not in bases:
+                bases.append(value)
+
+        body = _Builder(
+            self.mod,
+            self.source,
+            fallback=self.fallback,
+            qualname=qualname,
+            outer={**self.outer, **self.namespace},
+        )
+        body.postponed = self.postponed
+        body.missing = self.missing
+        namespace = body.run(node.body)
+        if (
+            any("dataclass" in self.unparse(d) for d in node.decorator_list)
+            and "__init__" not in namespace
+        ):
+            namespace["__init__"] = body._dataclass_init(node)
+        namespace["__doc__"] = ast.get_docstring(node, clean=False)
+        namespace["__module__"] = self.mod.__name__
+        namespace["__qualname__"] = qualname
+
+        try:
+            klass = types.new_class(
+                node.name, tuple(bases), exec_body=lambda ns: ns.update(namespace)
+            )
+        except Exception:
+            # Metaclasses such as EnumMeta expect a genuine class body, in which case only the
+            # parsed bases are kept
+            bases = [b for b in bases if b.__module__.split(".")[0] in _roots]
+            klass = type(node.name, tuple(bases) or (object,), namespace)
+
+        # inspect.getdoc looks up the class of a method through sys.modules, which doesn't know
+        # about hollow modules. The inherited docstrings are therefore filled in here.
+        for name, member in namespace.items():
+            if member.__doc__ is not None:
+                continue
+            doc = next(
+                (
+                    getattr(ancestor, name).__doc__
+                    for ancestor in klass.__mro__[1:]
+                    if getattr(getattr(ancestor, name, None), "__doc__", None)
+                ),
+                None,
+            )
+            if doc is None:
+                continue
+            if isinstance(member, property):
+                setattr(klass, name, property(member.fget, doc=doc))
+            elif inspect.isfunction(getattr(member, "__func__", member)):
+                getattr(member, "__func__", member).__doc__ = doc
+
+        self.namespace[node.name] = klass
@@ -0,0 +1,171 @@
+"""Content-addressed storage, for building the docs of several versions of a library.
+
+Most pages are identical from one version to the next. Each distinct file is therefore stored once,
+under the hash of its content, and the files of each version are hard links to it. A blob which
+isn't linked from anywhere anymore is removed by `Store.gc`.
+
+The store also remembers the outputs of expensive steps, such as rendering a page, by the digest
+of their inputs. An object which hasn't changed between two versions is thus only rendered once.
+
+Examples
+--------
+
+>>> import pathlib, tempfile
+
+>>> with tempfile.TemporaryDirectory() as root:
+...     store = Store(pathlib.Path(root, ".yamp-store"))
+...     writer = StoreWriter(store)
+...     _ = writer.write(pathlib.Path(root, "1.0", "index.md"), "Hello")
+...     _ = writer.write(pathlib.Path(root, "2.0", "index.md"), "Hello")
+...     print(len(store), pathlib.Path(root, "1.0", "index.md").stat().st_nlink)
+...     print(store.memoize("key", lambda: "Hi"), store.memoize("key", lambda: "Bye"))
+...     print(store.gc())
+1 3
+Hi Hi
+1
+
+"""
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+
+from yamp.writer import Writer, _hash
+
+MEMO = "memo.json"
+
+
+def _link(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Hard links aren't supported everywhere, in which case the file is duplicated
+        shutil.copy2(src, dst)
+
+
+class Store:
+    """A directory of files which are named after the hash of their content.
+
+    Parameters
+    ----------
+    root
+        The directory of the store. It has to be on the same file system as the files which link
+        to it.
+
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = pathlib.Path(root)
+        try:
+            self.memo = json.loads(self.root.joinpath(MEMO).read_text())
+        except (FileNotFoundError, ValueError):
+            self.memo = {}
+
+    def path(self, digest: str) -> pathlib.Path:
+        return self.root.joinpath(digest[:2], digest[2:])
+
+    def add(self, fill) -> pathlib.Path:
+        """Stores the file written by `fill`, which receives a path, and returns its blob."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.root.joinpath(f".{os.getpid()}.tmp")
+        try:
+            fill(tmp)
+            blob = self.path(_hash(tmp))
+            if blob.exists():
+                tmp.unlink()
+            else:
+                os.makedirs(blob.parent, exist_ok=True)
+                os.replace(tmp, blob)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return blob
+
+    def memoize(self, key: str, func) -> str:
+        """Returns the text which was produced under `key`, or produces it with `func`."""
+        if (digest := self.memo.get(key)) is not None:
+            try:
+                return self.path(digest).read_text()
+            except FileNotFoundError:
+                pass
+        text = func()
+        data = text.encode("utf-8")
+        self.add(lambda tmp: tmp.write_bytes(data))
+        self.memo[key] = hashlib.sha1(data).hexdigest()
+        return text
+
+    def _blobs(self):
+        for parent in self.root.iterdir():
+            if parent.is_dir():
+                yield from parent.iterdir()
+
+    def __len__(self):
+        return sum(1 for _ in self._blobs()) if self.root.exists() else 0
+
+    def _supports_links(self) -> bool:
+        probe = self.root.joinpath(f".{os.getpid()}.probe")
+        probe.touch()
+        try:
+            os.link(probe, probe.with_suffix(".link"))
+        except OSError:
+            return False
+        else:
+            probe.with_suffix(".link").unlink()
+            return True
+        finally:
+            probe.unlink()
+
+    def gc(self, directories=()) -> int:
+        """Removes the blobs which aren't linked from anywhere. Returns how many were removed.
+
+        On a file system without hard links, every file is a copy of its blob, which is thus never
+        linked. The blobs which are in use are then found by hashing the files in `directories`,
+        and nothing is removed if there are none.
+
+        """
+        removed = 0
+        if not self.root.exists():
+            return removed
+        if self._supports_links():
+            used = lambda blob: blob.stat().st_nlink > 1
+        elif directories:
+            digests = {
+                _hash(path)
+                for directory in directories
+                for path in pathlib.Path(directory).rglob("*")
+                if path.is_file()
+            }
+            used = lambda blob: blob.parent.name + blob.name in digests
+        else:
+            return removed
+        for blob in list(self._blobs()):
+            if not used(blob):
+                blob.unlink()
+                removed += 1
+        for parent in self.root.iterdir():
+            if parent.is_dir() and not any(parent.iterdir()):
+                parent.rmdir()
+        return removed
+
+    def save(self):
+        """Stores the memo on disk, without the entries whose blob has been removed."""
+        os.makedirs(self.root, exist_ok=True)
+        self.memo = {
+            key: digest
+            for key, digest in self.memo.items()
+            if self.path(digest).exists()
+        }
+        self.root.joinpath(MEMO).write_text(json.dumps(self.memo, indent=0))
+
+
+class StoreWriter(Writer):
+    """A writer which stores the content of the files it writes, and links them to the store."""
+
+    def __init__(self, store: Store):
+        super().__init__()
+        self.store = store
+
+    def _replace(self, path: pathlib.Path, fill):
+        blob = self.store.add(fill)
+        super()._replace(path, lambda tmp: _link(blob, tmp))
@@ -0,0 +1,131 @@
+"""Symbol table of the link index.
+
+A module, a class or a function can be mentioned under several names: the name of its module
+followed by its own, its dotted path, and the path of the module where it's defined. Each of these
+can also be prefixed with the name of the library. The table holds each symbol once, as a page and
+the name it is displayed with, which are stored in two arrays. The names point to their symbol by
+position. Names which are prefixed with the library's name aren't stored, as they resolve like the
+names they are prefixed to.
+
+Examples
+--------
+
+>>> table = SymbolTable("zoo")
+>>> table.add("animals.Dog", "animals/Dog", "animals.Dog")
+>>> table.add("zoo.animals.dogs.Dog", "animals/Dog", "animals.Dog")
+>>> table.add("animals", "animals")
+
+>>> table.resolve("zoo.animals.Dog")
+Symbol(path='animals/Dog', display='animals.Dog')
+>>> table.resolve("animals")
+Symbol(path='animals', display=None)
+>>> table.resolve("animals.Cat") is None
+True
+
+>>> len(table), len(table.paths)
+(3, 2)
+
+"""
+import typing
+
+
+class Symbol(typing.NamedTuple):
+    """A page of the API reference. Modules have no display name, as they are displayed as they
+    are mentioned."""
+
+    path: str
+    display: typing.Optional[str] = None
+
+
+class SymbolTable:
+    """Maps names to symbols.
+
+    Parameters
+    ----------
+    library
+        The name of the library, which may prefix the names.
+
+    """
+
+    def __init__(self, library: str):
+        self.library = library
+        self.prefix = f"{library}."
+        self.paths = []
+        self.displays = []
+        self.names = {}
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def insert(self, path: str, display: str = None) -> int:
+        """Returns the position of a symbol, which is added if it isn't in the table yet."""
+        if (position := self._positions.get((path, display))) is None:
+            position = self._positions[path, display] = len(self.paths)
+            self.paths.append(path)
+            self.displays.append(display)
+        return position
+
+    def add(self, name: str, path: str, display: str = None):
+        """Points a name to a symbol."""
+        self.names[name] = self.insert(path, display)
+
+    def _position(self, name: str) -> typing.Optional[int]:
+        # A prefixed name resolves like the name it is prefixed to, even if it is in the table
+        if name.startswith(self.prefix):
+            if (position := self._position(name[len(self.prefix) :])) is not None:
+                return position
+        return self.names.get(name)
+
+    def resolve(self, name: str) -> typing.Optional[Symbol]:
+        """Returns the symbol a name points to, or None if there is none."""
+        if (position := self._position(name)) is None:
+            return None
+        return Symbol(self.paths[position], self.displays[position])
+
+    def index(self):
+        """Spells out the table as a (path_index, rename_index) pair, with each name along with
+        its prefixed name."""
+        path_index, rename_index = {}, {}
+        for name in [*self.names, *(self.prefix + name for name in self.names)]:
+            position = self._position(name)
+            path_index[name] = self.paths[position]
+            if (display := self.displays[position]) is not None:
+                rename_index[name] = display
+        return path_index, rename_index
+
+    @classmethod
+    def from_index(cls, library: str, path_index: dict, rename_index: dict):
+        """Builds a table from a (path_index, rename_index) pair."""
+        table = cls(library)
+        for name, path in path_index.items():
+            table.add(name, path, rename_index.get(name))
+        # The prefixed names which resolve the same without being stored are dropped, unless
+        # they are prefixed in turn, which means that they were stored in the first place
+        n = len(table.prefix)
+        for name in [
+            name
+            for name, position in table.names.items()
+            if name.startswith(table.prefix)
+            and table.prefix + name not in path_index
+            and table._position(name[n:]) == position
+        ]:
+            del table.names[name]
+        return table
+
+    def dump(self) -> dict:
+        """Returns the table as JSON-serializable data."""
+        return {"paths": self.paths, "displays": self.displays, "names": self.names}
+
+    @classmethod
+    def load(cls, library: str, data: dict):
+        """Builds a table from the output of `dump`."""
+        table = cls(library)
+        table.paths = data["paths"]
+        table.displays = data["displays"]
+        table.names = data["names"]
+        table._positions = {
+            symbol: position
+            for position, symbol in enumerate(zip(table.paths, table.displays))
+        }
+        return table
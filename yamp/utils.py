@@ -2,6 +2,8 @@ import inspect
 import re
 from typing import Optional
 
+from yamp import profiling
+
 
 def snake_to_kebab(text: str) -> str:
     """
@@ -16,6 +18,88 @@ def snake_to_kebab(text: str) -> str:
     return text.replace("_", "-")
 
 
+_MISSING = object()
+
+
+class ResolutionCache:
+    """Memoizes the lookups made when walking through the ancestors of a class.
+
+    Sibling classes share most of their ancestors, so each ancestor's method signature and
+    docstring is only resolved once, and then reused for every subclass. The cache keeps count of
+    its hits and misses.
+
+    Examples
+    --------
+
+    >>> class Parent:
+    ...
+    ...     def foo(self, x: int):
+    ...         ...
+
+    >>> cache = ResolutionCache()
+    >>> cache.signature(Parent, 'foo')
+    <Signature (self, x: int)>
+    >>> cache.signature(Parent, 'foo')
+    <Signature (self, x: int)>
+    >>> cache.hits, cache.misses
+    (1, 1)
+
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._signatures = {}
+        self._docstrings = {}
+        self._resolved = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, memo, key, compute):
+        try:
+            value = memo[key]
+            self.hits += 1
+        except KeyError:
+            value = memo[key] = compute()
+            self.misses += 1
+        if value is _MISSING:
+            raise AttributeError(key[-1])
+        return value
+
+    def signature(self, klass, method: str) -> inspect.Signature:
+        """The signature of a class' method. An AttributeError is raised if it doesn't exist."""
+
+        def compute():
+            try:
+                meth = getattr(klass, method)
+            except AttributeError:
+                return _MISSING
+            return inspect.signature(meth)
+
+        return self._lookup(self._signatures, (klass, method), compute)
+
+    def docstring(self, klass, method: str) -> Optional[str]:
+        """The docstring of a class' method. An AttributeError is raised if it doesn't exist."""
+
+        def compute():
+            try:
+                return inspect.getdoc(getattr(klass, method))
+            except AttributeError:
+                return _MISSING
+
+        return self._lookup(self._docstrings, (klass, method), compute)
+
+    def resolve(self, function, klass, method: str):
+        """Memoizes the result of one of the find_method_* functions."""
+        return self._lookup(
+            self._resolved, (function, klass, method), lambda: function(klass, method)
+        )
+
+
+resolution_cache = ResolutionCache()
+
+
 def find_method_docstring(klass, method: str) -> Optional[str]:
     """Look through a class' ancestors for the first non-empty method docstring.
 
@@ -40,15 +124,20 @@ def find_method_docstring(klass, method: str) -> Optional[str]:
 
     """
 
+    return resolution_cache.resolve(_find_method_docstring, klass, method)
+
+
+def _find_method_docstring(klass, method: str) -> Optional[str]:
     for ancestor in inspect.getmro(klass):
         try:
-            ancestor_meth = getattr(ancestor, method)
+            doc = resolution_cache.docstring(ancestor, method)
         except AttributeError:
             break
-        if doc := inspect.getdoc(ancestor_meth):
+        if doc:
             return doc
 
 
+@profiling.timed("signature")
 def find_method_signature(klass, method: str) -> Optional[inspect.Signature]:
     """Look through a class' ancestors and fill out the methods signature.
 
@@ -77,8 +166,12 @@ def find_method_signature(klass, method: str) -> Optional[inspect.Signature]:
 
     """
 
+    return resolution_cache.resolve(_find_method_signature, klass, method)
+
+
+def _find_method_signature(klass, method: str) -> Optional[inspect.Signature]:
     m = getattr(klass, method)
-    sig = inspect.signature(m)
+    sig = resolution_cache.signature(klass, method)
 
     params = []
 
@@ -90,7 +183,7 @@ def find_method_signature(klass, method: str) -> Optional[inspect.Signature]:
 
         for ancestor in inspect.getmro(klass):
             try:
-                ancestor_meth = inspect.signature(getattr(ancestor, m.__name__))
+                ancestor_meth = resolution_cache.signature(ancestor, m.__name__)
             except AttributeError:
                 break
             try:
@@ -107,7 +200,7 @@ def find_method_signature(klass, method: str) -> Optional[inspect.Signature]:
     if return_annotation is inspect._empty:
         for ancestor in inspect.getmro(klass):
             try:
-                ancestor_meth = inspect.signature(getattr(ancestor, m.__name__))
+                ancestor_meth = resolution_cache.signature(ancestor, m.__name__)
             except AttributeError:
                 break
             if ancestor_meth.return_annotation is not inspect._empty:
@@ -0,0 +1,168 @@
+"""Keeps track of a library's source files, and reloads the modules which have been edited.
+
+The source files are polled, which doesn't require any dependency. When some modules change, the
+modules which refer to them are reloaded as well, so that no stale class or function is left behind.
+For instance, a package which re-exports a class from one of its submodules has to be reloaded
+after the submodule.
+
+"""
+import importlib
+import importlib.util
+import inspect
+import os
+import pathlib
+import sys
+from typing import Optional
+
+import yamp.static
+from yamp import cache
+
+
+def module_name(library: str, path: os.PathLike) -> Optional[str]:
+    """The dotted name of the module defined in a source file of a library.
+
+    Examples
+    --------
+
+    >>> import yamp
+    >>> module_name("yamp", pathlib.Path(yamp.__file__).parent / "watch.py")
+    'yamp.watch'
+
+    >>> module_name("yamp", pathlib.Path(yamp.__file__))
+    'yamp'
+
+    """
+    spec = importlib.util.find_spec(library)
+    for location in spec.submodule_search_locations or []:
+        try:
+            parts = list(pathlib.Path(path).relative_to(location).parts)
+        except ValueError:
+            continue
+        # Extension modules have suffixes such as .cpython-311-x86_64-linux-gnu.so
+        parts[-1] = parts[-1].split(".")[0]
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join([library, *parts])
+    # A library which isn't a package is a single module
+    if spec.origin and pathlib.Path(path) == pathlib.Path(spec.origin):
+        return library
+    return None
+
+
+class Watcher:
+    """Polls the source files of a library.
+
+    Parameters
+    ----------
+    library
+        The name of the library.
+    static
+        Whether the library has been built from its source code by `yamp.static`, rather than
+        imported.
+
+    """
+
+    def __init__(self, library: str, static=False):
+        self.library = library
+        self.static = static
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        snapshot = {}
+        for path in cache.source_files(self.library):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self) -> list:
+        """Returns the source files which have been edited, added or deleted since the last call."""
+        snapshot = self._scan()
+        changed = [
+            path
+            for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        ]
+        self.snapshot = snapshot
+        return sorted(changed)
+
+    def _modules(self) -> dict:
+        modules = yamp.static._modules if self.static else sys.modules
+        return {
+            name: mod
+            for name, mod in list(modules.items())
+            if name == self.library or name.startswith(f"{self.library}.")
+        }
+
+    def reload(self, paths) -> list:
+        """Reloads the modules defined in some source files, as well as the modules which depend
+        on them. The names of the reloaded modules are returned, in the order they were reloaded.
+
+        """
+        modules = self._modules()
+        changed = {name for path in paths if (name := module_name(self.library, path))}
+
+        # The modules whose source file has been deleted are forgotten about
+        for path in paths:
+            name = module_name(self.library, path)
+            if name and not os.path.exists(path):
+                self._forget(name)
+
+        def dependencies(mod):
+            deps = set()
+            for member in list(vars(mod).values()):
+                # A module is updated in place when it is reloaded, whereas the static loader
+                # builds a new one
+                if inspect.ismodule(member):
+                    if self.static:
+                        deps.add(member.__name__)
+                    continue
+                if not (inspect.isclass(member) or inspect.isfunction(member)):
+                    continue
+                deps.add(getattr(member, "__module__", None))
+                # Subclasses have to be rebuilt when one of their ancestors changes
+                if inspect.isclass(member) and member.__module__ == mod.__name__:
+                    deps.update(ancestor.__module__ for ancestor in member.__mro__[1:])
+            deps.discard(mod.__name__)
+            return deps & modules.keys()
+
+        graph = {name: dependencies(mod) for name, mod in modules.items()}
+        stale = set(changed)
+        while True:
+            more = {name for name, deps in graph.items() if deps & stale} - stale
+            if not more:
+                break
+            stale |= more
+
+        # Each module is reloaded after the modules it depends on, as far as possible
+        order = []
+        while len(order) < len(stale):
+            pending = sorted(stale - set(order))
+            ready = [
+                name for name in pending if not (graph.get(name, set()) & set(pending))
+            ]
+            order.extend(ready or pending[:1])
+
+        if self.static:
+            yamp.static.reload(order)
+            return [name for name in order if name in yamp.static._modules]
+
+        reloaded = []
+        for name in order:
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+            elif importlib.util.find_spec(name):
+                importlib.import_module(name)
+            else:
+                continue
+            reloaded.append(name)
+        return reloaded
+
+    def _forget(self, name: str):
+        modules = yamp.static._modules if self.static else sys.modules
+        modules.pop(name, None)
+        parent, _, attr = name.rpartition(".")
+        if parent in modules and hasattr(modules[parent], attr):
+            delattr(modules[parent], attr)
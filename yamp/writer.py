@@ -0,0 +1,314 @@
+"""Output layer which only touches the files whose content has changed.
+
+A file is only written if its content differs from what is already on disk. It is then written to a
+temporary file, which is renamed afterwards, so that a reader never sees a partial file. Leaving
+identical files alone means that their modification time is preserved, which keeps live reloading,
+rsync, and upload caches happy.
+
+A built site can also be precompressed, for static hosts which serve a compressed copy of a file,
+such as index.html.gz, when there is one. The copies are left alone as long as their file is
+unchanged. Brotli requires the brotli package.
+
+Examples
+--------
+
+>>> import pathlib, tempfile
+
+>>> with tempfile.TemporaryDirectory() as root:
+...     writer = Writer()
+...     path = pathlib.Path(root, "docs", "index.md")
+...     writer.write(path, "Hello")
+...     writer.write(path, "Hello")
+...     writer.write(path, "Hello world")
+...     _ = pathlib.Path(root, "docs", "old.md").write_text("Bye")
+...     writer.prune(root)
+...     print(writer.report())
+True
+False
+True
+1
+2 written, 1 unchanged, 1 deleted
+
+>>> with tempfile.TemporaryDirectory() as root:
+...     _ = pathlib.Path(root, "index.html").write_text("Hello")
+...     precompress(root, ["gz"])
+...     precompress(root, ["gz"])
+...     sorted(path.name for path in pathlib.Path(root).iterdir())
+1
+0
+['index.html', 'index.html.gz']
+
+"""
+import gzip
+import hashlib
+import os
+import pathlib
+import shutil
+
+from yamp import profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _gzip(src, dst):
+    # The modification time is left out, so that identical files are compressed identically
+    with gzip.GzipFile(
+        filename="", mode="wb", compresslevel=9, fileobj=dst, mtime=0
+    ) as out:
+        shutil.copyfileobj(src, out)
+
+
+def _brotli(src, dst):
+    compressor = brotli.Compressor()
+    for block in iter(lambda: src.read(1 << 16), b""):
+        dst.write(compressor.process(block))
+    dst.write(compressor.finish())
+
+
+# Each compressor copies a binary file to another one
+COMPRESSORS = {"gz": _gzip, "br": _brotli}
+
+# The files of a site which are worth compressing
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map")
+
+
+def _hash(path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Writer:
+    """Writes files if they have changed, and keeps count of what it did."""
+
+    def __init__(self):
+        self.written = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.paths = set()
+
+    def _replace(self, path: pathlib.Path, fill):
+        os.makedirs(path.parent, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            fill(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def read(self, path) -> str:
+        """Returns the content of a file, which may have been written by this writer."""
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+    def exists(self, path) -> bool:
+        """Whether a file is part of the output."""
+        return os.path.exists(path)
+
+    def keep(self, path):
+        """Marks a file as being part of the output, without looking at it."""
+        self.paths.add(os.path.abspath(path))
+        self.unchanged += 1
+
+    @profiling.timed("io")
+    def write(self, path, text) -> bool:
+        """Writes a file, unless it already has this content. Returns whether it was written.
+
+        The content is either text, which is encoded as UTF-8, or bytes.
+
+        """
+        path = pathlib.Path(path)
+        data = text if isinstance(text, bytes) else text.encode("utf-8")
+        self.paths.add(os.path.abspath(path))
+        try:
+            if (
+                path.stat().st_size == len(data)
+                and _hash(path) == hashlib.sha1(data).hexdigest()
+            ):
+                self.unchanged += 1
+                return False
+        except FileNotFoundError:
+            pass
+        self._replace(path, lambda tmp: tmp.write_bytes(data))
+        self.written += 1
+        return True
+
+    def write_chunks(self, path, chunks) -> bool:
+        """Writes a file from chunks of text, unless it already has this content. Returns whether
+        it was written.
+
+        The chunks are written to a temporary file as they come, so the content never has to be
+        held in memory as a whole.
+
+        """
+        path = pathlib.Path(path)
+        self.paths.add(os.path.abspath(path))
+        os.makedirs(path.parent, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.chunks")
+        h = hashlib.sha1()
+        size = 0
+        try:
+            with open(tmp, "wb") as file:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8")
+                    h.update(data)
+                    size += len(data)
+                    file.write(data)
+            try:
+                unchanged = path.stat().st_size == size and _hash(path) == h.hexdigest()
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged:
+                tmp.unlink()
+                self.unchanged += 1
+                return False
+            self._replace(path, lambda dst: os.replace(tmp, dst))
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.written += 1
+        return True
+
+    @profiling.timed("io")
+    def copy(self, src, dst) -> bool:
+        """Copies a file, unless the destination is identical. Returns whether it was copied."""
+        dst = pathlib.Path(dst)
+        self.paths.add(os.path.abspath(dst))
+        try:
+            a, b = os.stat(src), os.stat(dst)
+            # The modification time is preserved by copies, which saves from hashing both files
+            if a.st_size == b.st_size and (
+                a.st_mtime == b.st_mtime or _hash(src) == _hash(dst)
+            ):
+                self.unchanged += 1
+                return False
+        except FileNotFoundError:
+            pass
+        self._replace(dst, lambda tmp: shutil.copy2(src, tmp))
+        self.written += 1
+        return True
+
+    @profiling.timed("io")
+    def delete(self, path) -> bool:
+        """Deletes a file, if it exists. Returns whether it was deleted."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        self.deleted += 1
+        return True
+
+    def prune(self, root):
+        """Deletes the files in a directory which haven't been written or kept by this writer.
+
+        Directories which end up empty are removed as well. The number of deleted files is
+        returned.
+
+        """
+        deleted = self.deleted
+        for parent, dirs, names in os.walk(root, topdown=False):
+            for name in names:
+                path = os.path.abspath(os.path.join(parent, name))
+                if path not in self.paths:
+                    self.delete(path)
+            if parent != str(root) and not os.listdir(parent):
+                os.rmdir(parent)
+        return self.deleted - deleted
+
+    def report(self) -> str:
+        return f"{self.written} written, {self.unchanged} unchanged, {self.deleted} deleted"
+
+
+class MemoryWriter(Writer):
+    """Keeps the files in memory instead of writing them to disk.
+
+    The files are stored in a dict, which maps their absolute path to their content. It may be
+    shared between writers, for instance to rebuild the same files incrementally.
+
+    """
+
+    def __init__(self, files: dict = None):
+        super().__init__()
+        self.files = {} if files is None else files
+
+    def read(self, path) -> str:
+        try:
+            return self.files[os.path.abspath(path)]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def exists(self, path) -> bool:
+        return os.path.abspath(path) in self.files
+
+    def write(self, path, text: str) -> bool:
+        key = os.path.abspath(path)
+        self.paths.add(key)
+        if self.files.get(key) == text:
+            self.unchanged += 1
+            return False
+        self.files[key] = text
+        self.written += 1
+        return True
+
+    def write_chunks(self, path, chunks) -> bool:
+        return self.write(path, "".join(chunks))
+
+    def copy(self, src, dst) -> bool:
+        return self.write(dst, pathlib.Path(src).read_text())
+
+    def delete(self, path) -> bool:
+        if self.files.pop(os.path.abspath(path), None) is None:
+            return False
+        self.deleted += 1
+        return True
+
+    def prune(self, root):
+        deleted = self.deleted
+        root = os.path.join(os.path.abspath(root), "")
+        for path in list(self.files):
+            if path.startswith(root) and path not in self.paths:
+                self.delete(path)
+        return self.deleted - deleted
+
+
+def precompress(root, formats, suffixes=COMPRESSIBLE) -> int:
+    """Writes a compressed copy of each file of a site whose suffix is in `suffixes`, in each
+    one of the formats, among "gz" and "br". Returns the number of copies which were written.
+
+    A copy is left alone if it is newer than its file, which is the case of every file that a
+    rebuild hasn't touched.
+
+    """
+    for fmt in formats:
+        if fmt not in COMPRESSORS:
+            raise ValueError(f"Unknown compression format '{fmt}'")
+        if fmt == "br" and brotli is None:
+            raise ValueError("Brotli compression requires the brotli package")
+    written = 0
+    for parent, _, names in os.walk(root):
+        for name in names:
+            if not name.endswith(suffixes):
+                continue
+            path = pathlib.Path(parent, name)
+            mtime = path.stat().st_mtime_ns
+            for fmt in formats:
+                sibling = path.with_name(f"{name}.{fmt}")
+                try:
+                    if sibling.stat().st_mtime_ns >= mtime:
+                        continue
+                except FileNotFoundError:
+                    pass
+                tmp = sibling.with_name(f".{sibling.name}.{os.getpid()}.tmp")
+                try:
+                    with open(path, "rb") as src, open(tmp, "wb") as dst:
+                        COMPRESSORS[fmt](src, dst)
+                    os.replace(tmp, sibling)
+                finally:
+                    tmp.unlink(missing_ok=True)
+                written += 1
+    return written